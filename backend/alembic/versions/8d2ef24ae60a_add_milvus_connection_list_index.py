@@ -0,0 +1,42 @@
+"""Add milvus_connections list index
+
+Revision ID: 8d2ef24ae60a
+Revises: 3bca42321089
+Create Date: 2026-10-15 10:12:37.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2ef24ae60a'
+down_revision: Union[str, Sequence[str], None] = '3bca42321089'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 覆盖列表接口的 过滤(user_id, status) + 排序(created_at DESC) + 分页；
+    # CONCURRENTLY 建索引不锁写，但不能在事务中执行
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_milvus_connections_user_status_created',
+            'milvus_connections',
+            ['user_id', 'status', sa.text('created_at DESC')],
+            unique=False,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_milvus_connections_user_status_created',
+            table_name='milvus_connections',
+            postgresql_concurrently=True
+        )
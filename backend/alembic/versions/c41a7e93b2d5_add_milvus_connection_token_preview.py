@@ -0,0 +1,29 @@
+"""Add milvus_connections.token_preview
+
+Revision ID: c41a7e93b2d5
+Revises: 8d2ef24ae60a
+Create Date: 2026-10-15 11:03:18.240716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41a7e93b2d5'
+down_revision: Union[str, Sequence[str], None] = '8d2ef24ae60a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 旧数据保持 NULL，读取时回退为解密生成（结果按密文缓存）
+    op.add_column('milvus_connections', sa.Column('token_preview', sa.String(length=50), nullable=True, comment='认证 token 的脱敏预览，创建时生成，列表展示无需解密'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('milvus_connections', 'token_preview')
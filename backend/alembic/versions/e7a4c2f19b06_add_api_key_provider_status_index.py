@@ -0,0 +1,42 @@
+"""Add api_keys provider/status index
+
+Revision ID: e7a4c2f19b06
+Revises: c41a7e93b2d5
+Create Date: 2026-10-15 14:05:12.274310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a4c2f19b06'
+down_revision: Union[str, Sequence[str], None] = 'c41a7e93b2d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 覆盖按提供商查找活跃 Key 的过滤 (provider, status)；
+    # CONCURRENTLY 建索引不锁写，但不能在事务中执行
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_api_keys_provider_status',
+            'api_keys',
+            ['provider', 'status'],
+            unique=False,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_api_keys_provider_status',
+            table_name='api_keys',
+            postgresql_concurrently=True
+        )
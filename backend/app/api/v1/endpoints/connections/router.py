@@ -4,10 +4,10 @@ import time
 from typing import Optional
 from uuid import UUID
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 
-from app.core.crypto import get_public_key
+from app.core.crypto import get_public_key_response_bytes
 from app.core.security import get_current_active_user
 from app.core.db import get_db
 from app.models.user import User
@@ -24,7 +24,7 @@ router = APIRouter()
 @router.get("/public-key", summary="获取 RSA 公钥", response_model=RSAPublicKeyResponse)
 async def get_rsa_public_key(
     current_user: User = Depends(get_current_active_user)
-) -> RSAPublicKeyResponse:
+) -> Response:
     """
     获取 RSA 公钥
     
@@ -40,9 +40,7 @@ async def get_rsa_public_key(
         HTTPException: 当公钥获取失败时
     """
     try:
-        public_key_pem = get_public_key()
-        
-        return RSAPublicKeyResponse(public_key=public_key_pem)
+        return Response(content=get_public_key_response_bytes(), media_type="application/json")
         
     except RuntimeError as e:
         raise HTTPException(
@@ -85,19 +83,7 @@ async def create_milvus_connection(
             db=db
         )
         
-        return schemas.MilvusConnectionCreateResponse(
-            id=connection_data["id"],
-            name=connection_data["name"],
-            description=connection_data["description"],
-            uri=connection_data["uri"],
-            database_name=connection_data["database_name"],
-            token_info=connection_data["token_info"],
-            status=connection_data["status"],
-            usage_count=connection_data["usage_count"],
-            connection_string=connection_data["connection_string"],
-            created_at=connection_data["created_at"],
-            updated_at=connection_data["updated_at"]
-        )
+        return schemas.MilvusConnectionCreateResponse.model_validate(connection_data)
         
     except MilvusConnectionServiceError as e:
         if e.error_code == "DUPLICATE_NAME":
@@ -126,7 +112,7 @@ async def get_milvus_connections(
     size: int = Query(20, ge=1, le=100, description="每页数量"),
     status: Optional[str] = Query(None, regex="^(active|inactive)$", description="按状态过滤"),
     current_user: User = Depends(get_current_active_user)
-) -> schemas.MilvusConnectionList:
+) -> Response:
     """
     获取当前用户的 Milvus 连接配置列表
     
@@ -154,13 +140,15 @@ async def get_milvus_connections(
         
         pages = (result["total"] + size - 1) // size  # 向上取整
         
-        return schemas.MilvusConnectionList(
-            items=[schemas.MilvusConnectionResponse.model_validate(item) for item in result["items"]],
-            total=result["total"],
-            page=page,
-            size=size,
-            pages=pages
-        )
+        # 整页一次性校验并由 pydantic-core 直接序列化为 JSON，跳过 FastAPI 的二次校验和 dict 中转
+        page_data = schemas.MilvusConnectionList.model_validate({
+            "items": result["items"],
+            "total": result["total"],
+            "page": page,
+            "size": size,
+            "pages": pages
+        })
+        return Response(content=page_data.model_dump_json(), media_type="application/json")
         
     except Exception as e:
         logger.error(f"获取 Milvus 连接配置列表失败: {e}")
@@ -354,12 +342,13 @@ async def test_milvus_connection(
     
     try:
         # 使用服务层的统一验证方法
-        is_valid, message, response_time, server_version, collections_count = milvus_connection_service.validate_connection(
+        is_valid, message, response_time, server_version, collections_count = await milvus_connection_service.avalidate_connection(
             connection_id=connection_id,
             user_id=current_user.id,
             db=db,
             timeout_seconds=test_request.timeout_seconds,
-            save_result=True  # 保存测试结果
+            save_result=True,  # 保存测试结果
+            ttl_seconds=test_request.cache_ttl_seconds
         )
         
         return schemas.MilvusConnectionTestResponse(
@@ -0,0 +1,176 @@
+# backend/app/api/v1/endpoints/embeddings/router.py
+
+import hashlib
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.security import get_current_active_user
+from app.core.db import get_db
+from app.models.user import User
+from app.schemas import embedding as schemas
+from app.schemas.api_key import ApiProviderT
+from app.services.embedding_service import embedding_service, EmbeddingServiceError
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# 服务层错误码到 HTTP 状态码的映射
+_ERROR_STATUS = {
+    "NOT_FOUND": status.HTTP_404_NOT_FOUND,
+    "INACTIVE": status.HTTP_400_BAD_REQUEST,
+    "INVALID_INPUT": status.HTTP_400_BAD_REQUEST,
+    "TEXT_TOO_LONG": status.HTTP_400_BAD_REQUEST,
+    "PROVIDER_ERROR": status.HTTP_502_BAD_GATEWAY,
+    "TIMEOUT": status.HTTP_504_GATEWAY_TIMEOUT,
+}
+
+
+@router.post("/", summary="生成文本 embedding", response_model=schemas.EmbeddingCreateResponse)
+async def create_embeddings(
+    *,
+    db: Session = Depends(get_db),
+    request_in: schemas.EmbeddingCreateRequest,
+    current_user: User = Depends(get_current_active_user)
+) -> Response:
+    """
+    使用指定的 API Key 为文本列表生成 embedding 向量
+    
+    Args:
+        request_in: API Key、模型与文本列表
+        current_user: 当前用户
+        
+    Returns:
+        与输入文本一一对应的向量
+        
+    Raises:
+        HTTPException: API Key 不可用或提供商调用失败时
+    """
+    try:
+        embeddings = await embedding_service.create_embeddings(
+            api_key_id=request_in.api_key_id,
+            user_id=current_user.id,
+            texts=request_in.texts,
+            model=request_in.model,
+            db=db
+        )
+        
+        # 向量只在响应边界处转为列表；数值来自 float32 数组，跳过逐元素的校验
+        response_data = schemas.EmbeddingCreateResponse.model_construct(
+            model=request_in.model,
+            count=embeddings.shape[0],
+            dimension=embeddings.shape[1],
+            embeddings=embeddings.tolist()
+        )
+        return Response(content=response_data.model_dump_json(), media_type="application/json")
+        
+    except EmbeddingServiceError as e:
+        raise HTTPException(
+            status_code=_ERROR_STATUS.get(e.error_code, status.HTTP_500_INTERNAL_SERVER_ERROR),
+            detail=e.message
+        )
+    except Exception as e:
+        logger.error("生成 embedding 失败: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="生成 embedding 失败"
+        )
+
+
+@router.get("/providers/{provider}/models", summary="获取提供商支持的 embedding 模型", response_model=schemas.EmbeddingModelListResponse)
+async def get_provider_models(
+    provider: ApiProviderT,
+    request: Request,
+    current_user: User = Depends(get_current_active_user)
+) -> Response:
+    """
+    获取指定提供商支持的 embedding 模型
+    
+    模型列表是静态配置，不查询数据库；响应带 ETag，客户端可用 If-None-Match 做条件请求。
+    
+    Args:
+        provider: 服务提供商
+        current_user: 当前用户
+        
+    Returns:
+        模型名称列表
+    """
+    content = schemas.EmbeddingModelListResponse(
+        models=embedding_service.get_models_for_provider(provider)
+    ).model_dump_json().encode()
+    etag = f'"{hashlib.sha256(content).hexdigest()[:16]}"'
+    headers = {"Cache-Control": "private, max-age=3600", "ETag": etag}
+    
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+@router.get("/{key_id}/models", summary="获取可用 embedding 模型", response_model=schemas.EmbeddingModelListResponse)
+async def get_available_models(
+    *,
+    db: Session = Depends(get_db),
+    key_id: UUID,
+    current_user: User = Depends(get_current_active_user)
+) -> schemas.EmbeddingModelListResponse:
+    """
+    获取 API Key 对应提供商支持的 embedding 模型
+    
+    Args:
+        key_id: API Key ID
+        current_user: 当前用户
+        
+    Returns:
+        模型名称列表
+    """
+    try:
+        # 同步的数据库查询放到线程池执行，不阻塞事件循环
+        models = await run_in_threadpool(
+            embedding_service.get_available_models,
+            api_key_id=key_id,
+            user_id=current_user.id,
+            db=db
+        )
+        return schemas.EmbeddingModelListResponse(models=models)
+        
+    except EmbeddingServiceError as e:
+        raise HTTPException(
+            status_code=_ERROR_STATUS.get(e.error_code, status.HTTP_500_INTERNAL_SERVER_ERROR),
+            detail=e.message
+        )
+
+
+@router.post("/{key_id}/validate", summary="校验 API Key 能否生成 embedding", response_model=schemas.EmbeddingKeyValidationResponse)
+async def validate_api_key(
+    *,
+    db: Session = Depends(get_db),
+    key_id: UUID,
+    current_user: User = Depends(get_current_active_user)
+) -> schemas.EmbeddingKeyValidationResponse:
+    """
+    校验 API Key 能否正常调用提供商（不保存测试结果；短时间内重复校验复用缓存结果）
+    
+    Args:
+        key_id: API Key ID
+        current_user: 当前用户
+        
+    Returns:
+        校验结果与信息
+    """
+    try:
+        is_valid, message = await embedding_service.validate_api_key(
+            api_key_id=key_id,
+            user_id=current_user.id,
+            db=db
+        )
+        return schemas.EmbeddingKeyValidationResponse(success=is_valid, message=message)
+        
+    except EmbeddingServiceError as e:
+        raise HTTPException(
+            status_code=_ERROR_STATUS.get(e.error_code, status.HTTP_500_INTERNAL_SERVER_ERROR),
+            detail=e.message
+        )
@@ -1,19 +1,21 @@
 # backend/app/api/v1/endpoints/keys/router.py
 
 import time
+from functools import lru_cache
 from typing import Optional
 from uuid import UUID
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.core.crypto import get_public_key
+from app.core.crypto import get_public_key_response_bytes
 from app.core.security import get_current_active_user
 from app.core.db import get_db
 from app.models.user import User
 from app.schemas.crypto import RSAPublicKeyResponse
 from app.schemas import api_key as schemas
-from app.schemas.api_key import ApiProvider
+from app.schemas.api_key import API_PROVIDERS
 from app.services.api_key_service import api_key_service, ApiKeyServiceError
 
 import logging
@@ -22,23 +24,29 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+
+@lru_cache(maxsize=1)
+def _providers_response_bytes() -> bytes:
+    """供应商列表是常量，只序列化一次"""
+    return schemas.ApiProviderListResponse(providers=list(API_PROVIDERS)).model_dump_json().encode()
+
+
 @router.get("/providers", summary="获取支持的API供应商列表", response_model=schemas.ApiProviderListResponse)
 async def get_api_providers(
     current_user: User = Depends(get_current_active_user)
-) -> schemas.ApiProviderListResponse:
+) -> Response:
     """
     获取支持的API供应商列表
     
     返回所有支持的API供应商选项，前端可用于下拉选择器。
     """
-    providers = [provider.value for provider in ApiProvider]
-    return schemas.ApiProviderListResponse(providers=providers)
+    return Response(content=_providers_response_bytes(), media_type="application/json")
 
 
 @router.get("/public-key", summary="获取 RSA 公钥", response_model=RSAPublicKeyResponse)
 async def get_rsa_public_key(
     current_user: User = Depends(get_current_active_user)
-) -> RSAPublicKeyResponse:
+) -> Response:
     """
     获取 RSA 公钥
     
@@ -54,9 +62,7 @@ async def get_rsa_public_key(
         HTTPException: 当公钥获取失败时
     """
     try:
-        public_key_pem = get_public_key()
-        
-        return RSAPublicKeyResponse(public_key=public_key_pem)
+        return Response(content=get_public_key_response_bytes(), media_type="application/json")
         
     except RuntimeError as e:
         raise HTTPException(
@@ -101,17 +107,7 @@ async def create_api_key(
             db=db
         )
         
-        return schemas.ApiKeyCreateResponse(
-            id=api_key_data["id"],
-            name=api_key_data["name"],
-            provider=api_key_data["provider"],
-            base_url=api_key_data["base_url"],
-            key_preview=api_key_data["key_preview"],
-            status=api_key_data["status"],
-            usage_count=api_key_data["usage_count"],
-            created_at=api_key_data["created_at"],
-            updated_at=api_key_data["updated_at"]
-        )
+        return schemas.ApiKeyCreateResponse.model_validate(api_key_data)
         
     except ApiKeyServiceError as e:
         if e.error_code == "DUPLICATE_NAME":
@@ -141,7 +137,7 @@ async def get_api_keys(
     provider: Optional[str] = Query(None, description="按提供商过滤"),
     status: Optional[str] = Query(None, regex="^(active|inactive)$", description="按状态过滤"),
     current_user: User = Depends(get_current_active_user)
-) -> schemas.ApiKeyList:
+) -> Response:
     """
     获取当前用户的 API Key 列表
     
@@ -172,13 +168,15 @@ async def get_api_keys(
         
         pages = (result["total"] + size - 1) // size  # 向上取整
         
-        return schemas.ApiKeyList(
-            items=[schemas.ApiKeyResponse.model_validate(item) for item in result["items"]],
-            total=result["total"],
-            page=page,
-            size=size,
-            pages=pages
-        )
+        # 整页一次性校验并由 pydantic-core 直接序列化为 JSON，跳过 FastAPI 的二次校验和 dict 中转
+        page_data = schemas.ApiKeyList.model_validate({
+            "items": result["items"],
+            "total": result["total"],
+            "page": page,
+            "size": size,
+            "pages": pages
+        })
+        return Response(content=page_data.model_dump_json(), media_type="application/json")
         
     except Exception as e:
         logger.error(f"获取 API Key 列表失败: {e}")
@@ -216,7 +214,7 @@ async def get_api_key(
             db=db
         )
         
-        return schemas.ApiKeyResponse.model_validate(api_key_data)
+        return api_key_data
         
     except ApiKeyServiceError as e:
         if e.error_code == "NOT_FOUND":
@@ -268,7 +266,7 @@ async def update_api_key(
             db=db
         )
         
-        return schemas.ApiKeyResponse.model_validate(updated_data)
+        return updated_data
         
     except ApiKeyServiceError as e:
         if e.error_code == "NOT_FOUND":
@@ -370,8 +368,9 @@ async def test_api_key(
     start_time = time.time()
     
     try:
-        # 使用服务层的统一验证方法
-        is_valid, message, response_time = api_key_service.validate_api_key(
+        # 使用服务层的统一验证方法；验证会阻塞在网络请求和按提供商的并发上限上，放到线程池执行，不阻塞事件循环
+        is_valid, message, response_time = await run_in_threadpool(
+            api_key_service.validate_api_key,
             api_key_id=key_id,
             user_id=current_user.id,
             db=db,
@@ -3,6 +3,7 @@ from fastapi import APIRouter
 from app.api.v1.endpoints.auth.router import router as auth_router
 from app.api.v1.endpoints.keys.router import router as keys_router
 from app.api.v1.endpoints.connections.router import router as connections_router
+from app.api.v1.endpoints.embeddings.router import router as embeddings_router
 
 api_router = APIRouter()
 
@@ -14,3 +15,6 @@ api_router.include_router(keys_router, prefix="/keys", tags=["api-keys"])
 
 # 包含 Milvus 连接管理路由
 api_router.include_router(connections_router, prefix="/connections", tags=["milvus-connections"])
+
+# 包含向量化路由
+api_router.include_router(embeddings_router, prefix="/embeddings", tags=["embeddings"])
@@ -1,4 +1,5 @@
 import secrets
+from functools import cached_property, lru_cache
 from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import computed_field, Field
@@ -15,14 +16,22 @@ class Settings(BaseSettings):
     DB_HOST: Optional[str] = None
     DB_PORT: Optional[int] = None
     DB_NAME: Optional[str] = None
+    
+    # 数据库连接池配置；DB_POOL_SIZE 设为 0 时不做应用侧连接池（前面已有 PgBouncer 等外部连接池时使用）
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 40
+    DB_POOL_TIMEOUT: int = 10  # 等待空闲连接的秒数
+    DB_POOL_RECYCLE: int = 1800  # 连接最长存活秒数，早于服务端/代理的空闲断开
+    DB_QUERY_CACHE_SIZE: int = 1200  # SQL 编译缓存条目数（SQLAlchemy 默认 500）
 
     # --- 通过计算字段，动态构建完整的数据库连接 URL ---
     @computed_field
-    @property
+    @cached_property
     def DATABASE_URL(self) -> Optional[str]:
         """
         构建 SQLAlchemy 的数据库连接字符串。
         如果数据库配置不完整，返回 None。
+        配置在启动后不再变化，首次访问后缓存结果。
         """
         if not all([self.DB_USER, self.DB_PASSWORD, self.DB_HOST, self.DB_PORT, self.DB_NAME]):
             return None
@@ -45,6 +54,12 @@ class Settings(BaseSettings):
     
     # AES 加密配置
     AES_ENCRYPTION_KEY: Optional[str] = None
+    # 进程内缓存的已解密 API Key 数量（按密文缓存），设为 0 关闭缓存
+    API_KEY_DECRYPT_CACHE_SIZE: int = 512
+    # 单次 embedding 请求（含全部子批次与重试）的总超时秒数
+    EMBEDDING_TIMEOUT_SECONDS: float = 120.0
+    # 后台 Milvus 连接测试的最大并发线程数
+    MILVUS_TEST_WORKERS: int = 8
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
     
@@ -78,5 +93,15 @@ class Settings(BaseSettings):
             
             raise ValueError(error_msg)
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    返回全局唯一的 Settings 实例（只读取并校验一次 .env 和环境变量）
+    
+    可作为 FastAPI 依赖使用；测试中调用 get_settings.cache_clear() 重新加载配置
+    """
+    return Settings()
+
+
 # 创建一个全局唯一的 settings 实例，供整个应用导入和使用
-settings = Settings()
+settings = get_settings()
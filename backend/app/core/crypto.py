@@ -10,6 +10,7 @@ import secrets
 import logging
 
 from app.core.config import settings
+from app.schemas.crypto import RSAPublicKeyResponse
 
 logger = logging.getLogger(__name__)
 
@@ -154,6 +155,8 @@ class AESCrypto:
     
     def __init__(self, key: Optional[bytes] = None):
         self.key = key or self._get_key_from_config()
+        # 密钥不变，算法对象只构建一次，每次加解密只需新建携带 IV 的 Cipher
+        self._algorithm = algorithms.AES(self.key)
     
     def _get_key_from_config(self) -> bytes:
         """从配置获取 AES 密钥"""
@@ -181,7 +184,7 @@ class AESCrypto:
         
         # 创建加密器
         cipher = Cipher(
-            algorithms.AES(self.key),
+            self._algorithm,
             modes.CBC(iv),
             backend=default_backend()
         )
@@ -216,7 +219,7 @@ class AESCrypto:
         
         # 创建解密器
         cipher = Cipher(
-            algorithms.AES(self.key),
+            self._algorithm,
             modes.CBC(iv),
             backend=default_backend()
         )
@@ -245,6 +248,8 @@ class AESCrypto:
 # 全局实例（延迟初始化）
 rsa_manager: Optional[RSAKeyManager] = None
 aes_crypto: Optional[AESCrypto] = None
+# 公钥在进程生命周期内不变，初始化时序列化一次，接口直接返回缓存的响应体
+_public_key_response_bytes: Optional[bytes] = None
 
 
 def initialize_crypto() -> None:
@@ -252,13 +257,16 @@ def initialize_crypto() -> None:
     初始化加密系统
     应用启动时调用
     """
-    global rsa_manager, aes_crypto
+    global rsa_manager, aes_crypto, _public_key_response_bytes
     
     logger.info("🔐 初始化加密系统...")
     
     # 初始化 RSA 管理器
     rsa_manager = RSAKeyManager()
     rsa_manager.initialize()
+    _public_key_response_bytes = RSAPublicKeyResponse(
+        public_key=rsa_manager.get_public_key_pem()
+    ).model_dump_json().encode()
     
     # 初始化 AES 加密器
     aes_crypto = AESCrypto()
@@ -361,3 +369,15 @@ def get_public_key() -> str:
     if not rsa_manager:
         raise RuntimeError("加密系统未初始化，请先调用 initialize_crypto()")
     return rsa_manager.get_public_key_pem()
+
+
+def get_public_key_response_bytes() -> bytes:
+    """
+    获取已序列化的 RSA 公钥响应体（RSAPublicKeyResponse 的 JSON）
+    
+    Returns:
+        初始化时缓存的 JSON 字节串
+    """
+    if _public_key_response_bytes is None:
+        raise RuntimeError("加密系统未初始化，请先调用 initialize_crypto()")
+    return _public_key_response_bytes
@@ -4,10 +4,24 @@ from sqlalchemy.pool import NullPool
 
 from .config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    poolclass=NullPool
-)
+if settings.DB_POOL_SIZE > 0:
+    # 复用连接，避免每个请求都重新建立 TCP + TLS + 认证握手
+    engine = create_engine(
+        settings.DATABASE_URL,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True,  # 取出连接时探活，丢弃已被服务端断开的连接
+        pool_use_lifo=True,  # 优先复用最近归还的连接，突发流量过后多余连接可自然超时回收
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE
+    )
+else:
+    engine = create_engine(
+        settings.DATABASE_URL,
+        poolclass=NullPool,
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE
+    )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
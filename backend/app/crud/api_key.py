@@ -1,15 +1,49 @@
 # backend/app/crud/api_key.py
 
 from datetime import datetime
+import threading
+from collections import OrderedDict
 from typing import Optional, List
 from uuid import UUID
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy import and_, delete, func, select, update, bindparam
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 
 from app.models.api_key import ApiKey
 from app.schemas.api_key import ApiKeyCreate, ApiKeyUpdate
+from app.core.config import settings
 from app.core.crypto import encrypt_api_key, decrypt_api_key
 
+# 热点查询在模块加载时构建一次，调用时只绑定参数，配合引擎的编译缓存省去重复构建与编译
+_SELECT_BY_ID = select(ApiKey).where(
+    ApiKey.id == bindparam("id"),
+    ApiKey.user_id == bindparam("uid")
+)
+_SELECT_BY_NAME = select(ApiKey).where(
+    ApiKey.name == bindparam("name"),
+    ApiKey.user_id == bindparam("uid")
+)
+
+# 密文不变则明文不变，按密文缓存解密结果（LRU）；更换密钥会产生新密文，缓存自然失效，
+# 删除密钥时由 forget_plaintext_key 主动移除，明文不在内存中留存
+_decrypt_cache: "OrderedDict[str, str]" = OrderedDict()
+_decrypt_cache_lock = threading.Lock()
+
+
+def _decrypt_cached(encrypted_key: str) -> str:
+    with _decrypt_cache_lock:
+        plaintext = _decrypt_cache.get(encrypted_key)
+        if plaintext is not None:
+            _decrypt_cache.move_to_end(encrypted_key)
+            return plaintext
+    plaintext = decrypt_api_key(encrypted_key)
+    with _decrypt_cache_lock:
+        _decrypt_cache[encrypted_key] = plaintext
+        while len(_decrypt_cache) > settings.API_KEY_DECRYPT_CACHE_SIZE:
+            _decrypt_cache.popitem(last=False)
+    return plaintext
+
 
 class ApiKeyCRUD:
     """API Key CRUD 操作类"""
@@ -20,17 +54,19 @@ class ApiKeyCRUD:
         *, 
         obj_in: ApiKeyCreate, 
         user_id: UUID
-    ) -> ApiKey:
+    ) -> Optional[ApiKey]:
         """
         创建新的 API Key
         
+        使用 INSERT ... ON CONFLICT DO NOTHING RETURNING，名称查重与插入在一条语句中完成
+        
         Args:
             db: 数据库会话
             obj_in: 创建请求数据
             user_id: 用户ID
             
         Returns:
-            创建的 API Key 对象
+            创建的 API Key 对象；同一用户下名称已存在时返回 None
         """
         # 1. 双重加密：RSA解密 + AES加密存储
         encrypted_for_db = encrypt_api_key(obj_in.encrypted_api_key)
@@ -38,20 +74,26 @@ class ApiKeyCRUD:
         # 2. 解密生成预览（仅用于预览生成，不存储明文）
         original_key = decrypt_api_key(encrypted_for_db)
         
-        # 3. 创建数据库对象
-        db_obj = ApiKey(
-            user_id=user_id,
-            name=obj_in.name,
-            provider=obj_in.provider,
-            base_url=obj_in.base_url,
-            encrypted_api_key=encrypted_for_db,
-            key_preview=ApiKey().generate_key_preview(original_key),
-            status="active"
+        # 3. 插入数据库（名称冲突时不插入任何行）
+        stmt = (
+            insert(ApiKey)
+            .values(
+                user_id=user_id,
+                name=obj_in.name,
+                provider=obj_in.provider,
+                base_url=obj_in.base_url,
+                encrypted_api_key=encrypted_for_db,
+                key_preview=ApiKey.generate_key_preview(original_key),
+                status="active"
+            )
+            .on_conflict_do_nothing(constraint="uq_user_api_key_name")
+            .returning(ApiKey)
         )
-        
-        db.add(db_obj)
+        db_obj = db.scalars(stmt).first()
+        # RETURNING 已带回完整行；先从会话移出，避免提交时过期后读取属性再触发一次 SELECT
+        if db_obj is not None:
+            db.expunge(db_obj)
         db.commit()
-        db.refresh(db_obj)
         return db_obj
 
     def get(self, db: Session, *, id: UUID, user_id: UUID) -> Optional[ApiKey]:
@@ -66,9 +108,7 @@ class ApiKeyCRUD:
         Returns:
             API Key 对象或 None
         """
-        return db.query(ApiKey).filter(
-            and_(ApiKey.id == id, ApiKey.user_id == user_id)
-        ).first()
+        return db.scalars(_SELECT_BY_ID, {"id": id, "uid": user_id}).one_or_none()
 
     def get_multi(
         self, 
@@ -134,10 +174,62 @@ class ApiKeyCRUD:
             setattr(db_obj, field, value)
         
         db.add(db_obj)
-        db.commit()
+        try:
+            db.commit()
+        except IntegrityError:
+            # 名称唯一约束冲突等，交由调用方处理
+            db.rollback()
+            raise
         db.refresh(db_obj)
         return db_obj
 
+    def update_by_id(
+        self, 
+        db: Session, 
+        *, 
+        id: UUID, 
+        user_id: UUID, 
+        obj_in: ApiKeyUpdate
+    ) -> Optional[ApiKey]:
+        """
+        按 ID 更新用户的 API Key
+        
+        使用 UPDATE ... RETURNING，一条语句完成权限过滤、更新和回读，无需先查询再刷新
+        
+        Args:
+            db: 数据库会话
+            id: API Key ID
+            user_id: 用户ID（权限控制）
+            obj_in: 更新数据
+            
+        Returns:
+            更新后的 API Key 对象；不存在或无权限时返回 None
+            
+        Raises:
+            IntegrityError: 违反唯一约束（如名称重复）时
+        """
+        update_data = obj_in.model_dump(exclude_unset=True)
+        if not update_data:
+            return self.get(db=db, id=id, user_id=user_id)
+        
+        stmt = (
+            update(ApiKey)
+            .where(ApiKey.id == id, ApiKey.user_id == user_id)
+            .values(**update_data)
+            .returning(ApiKey)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            db_obj = db.scalars(stmt).one_or_none()
+            if db_obj is not None:
+                db.expunge(db_obj)
+            db.commit()
+        except IntegrityError:
+            # 名称唯一约束冲突等，交由调用方处理
+            db.rollback()
+            raise
+        return db_obj
+
     def delete(self, db: Session, *, id: UUID, user_id: UUID) -> bool:
         """
         删除用户的 API Key
@@ -150,15 +242,31 @@ class ApiKeyCRUD:
         Returns:
             是否删除成功
         """
-        obj = db.query(ApiKey).filter(
-            and_(ApiKey.id == id, ApiKey.user_id == user_id)
-        ).first()
+        return self.delete_returning_encrypted_key(db=db, id=id, user_id=user_id) is not None
+
+    def delete_returning_encrypted_key(self, db: Session, *, id: UUID, user_id: UUID) -> Optional[str]:
+        """
+        删除用户的 API Key，并返回被删除记录的密文
         
-        if obj:
-            db.delete(obj)
-            db.commit()
-            return True
-        return False
+        使用 DELETE ... RETURNING，一条语句完成权限过滤与删除，无需先查询
+        
+        Args:
+            db: 数据库会话
+            id: API Key ID
+            user_id: 用户ID（权限控制）
+            
+        Returns:
+            被删除 API Key 的加密密钥；不存在或无权限时返回 None
+        """
+        stmt = (
+            delete(ApiKey)
+            .where(ApiKey.id == id, ApiKey.user_id == user_id)
+            .returning(ApiKey.encrypted_api_key)
+            .execution_options(synchronize_session=False)
+        )
+        encrypted_key = db.scalars(stmt).one_or_none()
+        db.commit()
+        return encrypted_key
 
     def get_by_name(
         self, 
@@ -178,9 +286,7 @@ class ApiKeyCRUD:
         Returns:
             API Key 对象或 None
         """
-        return db.query(ApiKey).filter(
-            and_(ApiKey.name == name, ApiKey.user_id == user_id)
-        ).first()
+        return db.scalars(_SELECT_BY_NAME, {"name": name, "uid": user_id}).one_or_none()
 
     def get_active_by_provider(
         self, 
@@ -208,27 +314,25 @@ class ApiKeyCRUD:
             )
         ).all()
 
-    def update_usage(
-        self, 
-        db: Session, 
-        *, 
-        db_obj: ApiKey
-    ) -> ApiKey:
+    def add_usage_batch(self, db: Session, *, rows: List[dict]) -> None:
         """
-        更新 API Key 使用统计
-        
+        批量累加多个 API Key 的使用次数（一条 executemany UPDATE）
+
         Args:
             db: 数据库会话
-            db_obj: API Key 对象
-            
-        Returns:
-            更新后的 API Key 对象
+            rows: [{"key_id": UUID, "delta": 增量, "last_used_at": 最后使用时间}, ...]
         """
-        db_obj.update_last_used()
-        db.add(db_obj)
+        table = ApiKey.__table__
+        db.execute(
+            update(table)
+            .where(table.c.id == bindparam("key_id"))
+            .values(
+                usage_count=table.c.usage_count + bindparam("delta"),
+                last_used_at=bindparam("last_used_at")
+            ),
+            rows
+        )
         db.commit()
-        db.refresh(db_obj)
-        return db_obj
 
     def get_plaintext_key(self, *, encrypted_key: str) -> str:
         """
@@ -240,7 +344,29 @@ class ApiKeyCRUD:
         Returns:
             解密后的明文 API Key
         """
-        return decrypt_api_key(encrypted_key)
+        return _decrypt_cached(encrypted_key)
+
+    def get_plaintext_keys_batch(self, *, encrypted_keys: List[str]) -> List[str]:
+        """
+        批量解密多个 API Key（共用同一个 AES 实例与解密缓存，重复密文只解密一次）
+        
+        Args:
+            encrypted_keys: 数据库中的加密密钥列表
+            
+        Returns:
+            与输入一一对应的明文 API Key 列表
+        """
+        return [_decrypt_cached(encrypted_key) for encrypted_key in encrypted_keys]
+
+    def forget_plaintext_key(self, *, encrypted_key: str) -> None:
+        """
+        从解密缓存中移除该密钥的明文（API Key 删除后调用）
+        
+        Args:
+            encrypted_key: 数据库中的加密密钥
+        """
+        with _decrypt_cache_lock:
+            _decrypt_cache.pop(encrypted_key, None)
     
     def get_plaintext_key_by_id(self, db: Session, *, api_key_id: UUID, user_id: UUID) -> Optional[str]:
         """
@@ -255,17 +381,14 @@ class ApiKeyCRUD:
             解密后的明文 API Key，如果不存在或无权限则返回 None
         """
         # 先验证权限：确保密钥属于该用户
-        db_obj = db.query(ApiKey).filter(
-            ApiKey.id == api_key_id,
-            ApiKey.user_id == user_id
-        ).first()
+        db_obj = db.scalars(_SELECT_BY_ID, {"id": api_key_id, "uid": user_id}).one_or_none()
         
         if not db_obj:
             return None
             
         # 解密并返回明文密钥
         try:
-            return decrypt_api_key(db_obj.encrypted_api_key)
+            return _decrypt_cached(db_obj.encrypted_api_key)
         except Exception:
             return None
 
@@ -280,22 +403,27 @@ class ApiKeyCRUD:
         Returns:
             统计信息字典
         """
-        total = db.query(func.count(ApiKey.id)).filter(ApiKey.user_id == user_id).scalar()
-        active = db.query(func.count(ApiKey.id)).filter(
-            and_(ApiKey.user_id == user_id, ApiKey.status == "active")
-        ).scalar()
-        
-        # 按提供商统计
-        provider_stats = db.query(
-            ApiKey.provider, 
+        # 一次 GROUP BY (provider, status) 查询，总数/活跃数/按提供商统计都由分组结果汇总
+        rows = db.query(
+            ApiKey.provider,
+            ApiKey.status,
             func.count(ApiKey.id).label('count')
-        ).filter(ApiKey.user_id == user_id).group_by(ApiKey.provider).all()
+        ).filter(ApiKey.user_id == user_id).group_by(ApiKey.provider, ApiKey.status).all()
+        
+        total = 0
+        active = 0
+        by_provider: dict = {}
+        for row in rows:
+            total += row.count
+            if row.status == "active":
+                active += row.count
+            by_provider[row.provider] = by_provider.get(row.provider, 0) + row.count
         
         return {
             "total": total,
             "active": active,
             "inactive": total - active,
-            "by_provider": {stat.provider: stat.count for stat in provider_stats}
+            "by_provider": by_provider
         }
 
 
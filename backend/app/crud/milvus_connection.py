@@ -4,7 +4,7 @@ from datetime import datetime, timedelta
 from typing import Optional, List
 from uuid import UUID
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy import and_, func, select
 
 from app.models.milvus_connection import MilvusConnection
 from app.schemas.milvus_connection import MilvusConnectionCreate, MilvusConnectionUpdate
@@ -34,11 +34,13 @@ class MilvusConnectionCRUD:
         """
         # 处理认证信息加密
         encrypted_token = None
+        token_preview = None
         
         if obj_in.encrypted_token:
-            # Token：RSA解密 + AES加密存储
+            # Token：RSA解密 + AES加密存储，同时生成脱敏预览（读取时无需再解密）
             decrypted_token = decrypt_rsa(obj_in.encrypted_token)
             encrypted_token = encrypt_sensitive_data(decrypted_token)
+            token_preview = MilvusConnection.generate_token_preview(decrypted_token)
         
         # 创建数据库对象
         db_obj = MilvusConnection(
@@ -48,6 +50,7 @@ class MilvusConnectionCRUD:
             uri=obj_in.uri,
             database_name=obj_in.database_name,
             encrypted_token=encrypted_token,
+            token_preview=token_preview,
             status="active"
         )
         
@@ -94,19 +97,27 @@ class MilvusConnectionCRUD:
         Returns:
             (连接配置列表, 总数量)
         """
-        query = db.query(MilvusConnection).filter(MilvusConnection.user_id == user_id)
+        conditions = [MilvusConnection.user_id == user_id]
         
         # 添加过滤条件
         if status:
-            query = query.filter(MilvusConnection.status == status)
-            
-        # 获取总数
-        total = query.count()
+            conditions.append(MilvusConnection.status == status)
+        
+        # 分页查询，总数由窗口函数 COUNT(*) OVER () 在同一条语句中算出
+        rows = db.execute(
+            select(MilvusConnection, func.count().over().label("total"))
+            .where(*conditions)
+            .order_by(MilvusConnection.created_at.desc())
+            .offset(skip)
+            .limit(limit)
+        ).all()
         
-        # 分页查询
-        items = query.order_by(MilvusConnection.created_at.desc()).offset(skip).limit(limit).all()
+        if rows:
+            return [row[0] for row in rows], rows[0].total
         
-        return items, total
+        # 页码越界时窗口函数没有可返回的行，单独统计总数
+        total = db.scalar(select(func.count()).select_from(MilvusConnection).where(*conditions)) if skip else 0
+        return [], total
 
     def update(
         self, 
@@ -287,35 +298,28 @@ class MilvusConnectionCRUD:
         Returns:
             统计信息字典
         """
-        total = db.query(func.count(MilvusConnection.id)).filter(
-            MilvusConnection.user_id == user_id
-        ).scalar()
-        
-        active = db.query(func.count(MilvusConnection.id)).filter(
-            and_(MilvusConnection.user_id == user_id, MilvusConnection.status == "active")
-        ).scalar()
-        
-        # 最近7天使用过的连接数
+        # 最近7天使用过的连接数与按状态统计合并为一条 GROUP BY 查询
         seven_days_ago = datetime.utcnow() - timedelta(days=7)
-        recently_used = db.query(func.count(MilvusConnection.id)).filter(
-            and_(
-                MilvusConnection.user_id == user_id,
-                MilvusConnection.last_used_at >= seven_days_ago
+        status_stats = db.execute(
+            select(
+                MilvusConnection.status,
+                func.count().label("count"),
+                func.count().filter(MilvusConnection.last_used_at >= seven_days_ago).label("recently_used")
             )
-        ).scalar()
+            .where(MilvusConnection.user_id == user_id)
+            .group_by(MilvusConnection.status)
+        ).all()
         
-        # 按状态统计
-        status_stats = db.query(
-            MilvusConnection.status, 
-            func.count(MilvusConnection.id).label('count')
-        ).filter(MilvusConnection.user_id == user_id).group_by(MilvusConnection.status).all()
+        by_status = {stat.status: stat.count for stat in status_stats}
+        total = sum(by_status.values())
+        active = by_status.get("active", 0)
         
         return {
             "total": total,
             "active": active,
             "inactive": total - active,
-            "recently_used": recently_used,
-            "by_status": {stat.status: stat.count for stat in status_stats}
+            "recently_used": sum(stat.recently_used for stat in status_stats),
+            "by_status": by_status
         }
 
     def update_test_result(
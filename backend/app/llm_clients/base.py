@@ -1,31 +1,235 @@
+import asyncio
+import re
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, List, Dict, Any, Tuple
+
+import numpy as np
+
+# create_embeddings 的返回值：默认为 (N, dim) 的 float32 数组；
+# options={"return_format": "list"} 时返回 List[List[float]]（兼容旧调用方）
+Embeddings = np.ndarray | List[List[float]]
+
+# 中日韩文字与全角标点：词之间没有空格，常见分词器大致每个字符切出一个 token
+_CJK_CHARS = re.compile(r"[\u3000-\u303f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    无分词器时的 token 估算：中日韩字符每个计 1 个 token，其余部分按空白分词计数。
+
+    Args:
+        text: 文本
+
+    Returns:
+        估算的 token 数
+    """
+    cjk_count = len(_CJK_CHARS.findall(text))
+    if not cjk_count:
+        return len(text.split())
+    return cjk_count + len(_CJK_CHARS.sub(" ", text).split())
+
 
 class LLMClient(ABC):
     """
     所有 Embedding 客户端必须遵循的抽象基类 (接口).
     """
+    # 单个请求的 token 上限与条数上限（OpenAI embedding: 300k tokens/请求，留出余量）
+    MAX_BATCH_TOKENS = 250_000
+    MAX_BATCH_ITEMS = 2048
+    # 同时在途的子批次请求数上限
+    MAX_CONCURRENT_BATCHES = 8
+
     def __init__(self, api_key: str | None = None, base_url: str | None = None):
         self.api_key = api_key
         self.base_url = base_url
 
     @abstractmethod
-    def create_embeddings(self, texts: List[str], options: Dict[str, Any]) -> List[List[float]]:
+    def create_embeddings(self, texts: List[str], options: Dict[str, Any]) -> Embeddings:
         """
         接收一个文本列表，为每个文本生成一个 embedding 向量。
 
         Args:
             texts: 需要被向量化的字符串列表。
-            options: 其他参数, e.g., {"model": "text-embedding-3-small"}
+            options: 其他参数, e.g., {"model": "text-embedding-3-small"}；
+                传入 {"return_format": "list"} 时返回嵌套列表
 
         Returns:
-            一个包含多个 embedding 向量的列表, e.g., [[0.1, 0.2, ...], [0.3, 0.4, ...]]
+            形状为 (N, dim) 的 float32 数组，第 i 行对应 texts[i]
         """
         pass
-    
+
+    async def acreate_embeddings(self, texts: List[str], options: Dict[str, Any]) -> Embeddings:
+        """
+        create_embeddings 的异步版本，网络等待期间不阻塞事件循环。
+
+        默认在线程池中执行同步实现，子类可用 SDK 的异步客户端覆盖。
+        """
+        return await asyncio.to_thread(self.create_embeddings, texts, options)
+
     @abstractmethod
     def validate_api_key(self) -> Tuple[bool, str]:
         """
         验证 API Key 是否有效。
         """
-        pass
\ No newline at end of file
+        pass
+
+    def count_tokens(self, texts: List[str], model: str) -> List[int]:
+        """
+        估算每个文本的 token 数，子类可按提供商的分词器覆盖。
+
+        默认按空白分词估算，中日韩字符每个计 1 个 token（见 estimate_tokens）。
+        """
+        return [estimate_tokens(text) for text in texts]
+
+    def split_text(self, text: str, model: str, max_tokens: int, overlap: int = 0) -> List[str]:
+        """
+        把超过 token 上限的文本切分为若干重叠窗口，未超限时原样返回。
+
+        默认按 count_tokens 估算出的平均每 token 字符数换算成字符窗口，
+        子类有精确分词器时可按 token 切分覆盖。
+
+        Args:
+            text: 文本
+            model: 模型名称（用于选择分词器）
+            max_tokens: 单个窗口的 token 上限
+            overlap: 相邻窗口重叠的 token 数
+
+        Returns:
+            窗口文本列表
+        """
+        n_tokens = self.count_tokens([text], model)[0]
+        if n_tokens <= max_tokens:
+            return [text]
+
+        chars_per_token = len(text) / n_tokens
+        window = max(1, int(max_tokens * chars_per_token))
+        overlap_chars = min(int(overlap * chars_per_token), window - 1)
+        return [
+            text[start:start + window]
+            for start in range(0, len(text) - overlap_chars, window - overlap_chars)
+        ]
+
+    def _pack_by_tokens(
+        self,
+        texts: List[str],
+        model: str,
+        max_tokens: int | None = None,
+        max_items: int | None = None
+    ) -> List[slice]:
+        """
+        按 token 上限和条数上限把文本切分为若干子批次。
+
+        Args:
+            texts: 文本列表
+            model: 模型名称（用于选择分词器）
+            max_tokens: 单个子批次的 token 上限
+            max_items: 单个子批次的条数上限
+
+        Returns:
+            子批次在 texts 中的切片列表，按原顺序排列
+        """
+        max_tokens = max_tokens or self.MAX_BATCH_TOKENS
+        max_items = max_items or self.MAX_BATCH_ITEMS
+
+        slices: List[slice] = []
+        start = 0
+        batch_tokens = 0
+        for i, n_tokens in enumerate(self.count_tokens(texts, model)):
+            # 当前批次非空且加入后会超限时，先封口当前批次
+            if i > start and (batch_tokens + n_tokens > max_tokens or i - start >= max_items):
+                slices.append(slice(start, i))
+                start = i
+                batch_tokens = 0
+            batch_tokens += n_tokens
+
+        if start < len(texts):
+            slices.append(slice(start, len(texts)))
+        return slices
+
+    def _run_batches(
+        self,
+        texts: List[str],
+        model: str,
+        options: Dict[str, Any],
+        send: Callable[[List[str]], np.ndarray]
+    ) -> Embeddings:
+        """
+        把文本切分为子批次并用线程池并发发送，按原顺序拼接结果。
+
+        Args:
+            texts: 文本列表
+            model: 模型名称
+            options: 调用参数（max_batch_tokens / max_batch_items / max_concurrency / return_format）
+            send: 发送单个子批次并返回其 (n, dim) float32 数组的函数
+
+        Returns:
+            与 texts 一一对应的向量数组（或按 return_format 返回列表）
+        """
+        if not texts:
+            return self._empty_embeddings(options)
+
+        batches = self._pack_by_tokens(
+            texts,
+            model,
+            max_tokens=options.get("max_batch_tokens"),
+            max_items=options.get("max_batch_items")
+        )
+        if len(batches) == 1:
+            return self._format_embeddings([send(texts[batches[0]])], options)
+
+        max_workers = min(len(batches), options.get("max_concurrency") or self.MAX_CONCURRENT_BATCHES)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(lambda batch: send(texts[batch]), batches))
+        return self._format_embeddings(results, options)
+
+    async def _arun_batches(
+        self,
+        texts: List[str],
+        model: str,
+        options: Dict[str, Any],
+        send: Callable[[List[str]], Awaitable[np.ndarray]]
+    ) -> Embeddings:
+        """
+        _run_batches 的异步版本，用信号量限制同时在途的子批次数。
+        """
+        if not texts:
+            return self._empty_embeddings(options)
+
+        semaphore = asyncio.Semaphore(options.get("max_concurrency") or self.MAX_CONCURRENT_BATCHES)
+
+        async def run(batch: slice) -> np.ndarray:
+            async with semaphore:
+                return await send(texts[batch])
+
+        results = await asyncio.gather(*(
+            run(batch) for batch in self._pack_by_tokens(
+                texts,
+                model,
+                max_tokens=options.get("max_batch_tokens"),
+                max_items=options.get("max_batch_items")
+            )
+        ))
+        return self._format_embeddings(results, options)
+
+    @staticmethod
+    def _to_array(vectors: List[List[float]]) -> np.ndarray:
+        """把提供商返回的向量列表转为 (n, dim) 的 float32 数组"""
+        return np.asarray(vectors, dtype=np.float32).reshape(len(vectors), -1)
+
+    @staticmethod
+    def _empty_embeddings(options: Dict[str, Any]) -> Embeddings:
+        """空输入的返回值：不发请求，返回 (0, 0) 数组或空列表"""
+        if options.get("return_format") == "list":
+            return []
+        return np.empty((0, 0), dtype=np.float32)
+
+    @staticmethod
+    def _format_embeddings(results: List[np.ndarray], options: Dict[str, Any]) -> Embeddings:
+        """
+        按顺序拼接各子批次的结果，并按 return_format 决定返回数组还是嵌套列表。
+        """
+        embeddings = results[0] if len(results) == 1 else np.concatenate(results)
+        if options.get("return_format") == "list":
+            return embeddings.tolist()
+        return embeddings
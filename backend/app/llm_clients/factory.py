@@ -1,3 +1,10 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Tuple
+
 from .base import LLMClient
 from .openai_client import OpenAIClient
 from .ollama_client import OllamaClient
@@ -8,16 +15,20 @@ class LLMClientFactory:
     
     # 2. 为这些兼容的客户端提供各自的“验证说明书”
     _VALIDATION_CONFIGS = {
+        # key_pattern: 密钥格式不符时本地直接判定无效，不发网络请求（只约束稳定的前缀，宁松勿严）；
+        # openai 常配合自定义 base_url 接入各类兼容网关，密钥格式不固定，故不设
         "openai": {
             "method": "list_models"
         },
         "siliconflow": {
             "method": "embedding",
-            "test_model": "BAAI/bge-large-zh-v1.5" # 硅基流动的测试模型
+            "test_model": "BAAI/bge-large-zh-v1.5", # 硅基流动的测试模型
+            "key_pattern": re.compile(r"sk-\S+")
         },
         "nvidia-nim": {
             "method": "embedding",
-            "test_model": "baai/bge-m3" # NVIDIA NIM 的测试模型
+            "test_model": "baai/bge-m3", # NVIDIA NIM 的测试模型
+            "key_pattern": re.compile(r"nvapi-\S+")
         },
         "bce-qianfan": {
             "method": "embedding",
@@ -25,15 +36,124 @@ class LLMClientFactory:
         },
     }
     
+    # 以 base64 返回向量的提供商（省去 JSON 浮点数解析）；其他兼容服务对该参数的支持不一，按浮点列表请求
+    _BASE64_EMBEDDING_PROVIDERS = {"openai"}
+
     # 3. 特殊的客户端类
     _clients = {
         "ollama": OllamaClient,
     }
 
+    # 5. 客户端实例缓存：复用 SDK 连接池，避免每次调用重新建立 TCP/TLS 连接
+    _CLIENT_CACHE_SIZE = 256
+    _client_cache: "OrderedDict[tuple, LLMClient]" = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    # 6. 密钥校验结果缓存：成功结果保留较久，失败结果很快过期以便用户修正后重试
+    _VALIDATION_TTL_SECONDS = 300.0
+    _VALIDATION_NEGATIVE_TTL_SECONDS = 30.0
+    _validation_cache: "OrderedDict[tuple, Tuple[bool, str, float]]" = OrderedDict()
+
+    # 7. 每个提供商同时在途的校验请求上限，突发校验时不触发提供商限流（429）
+    _VALIDATION_CONCURRENCY = {"openai": 10, "nvidia-nim": 5, "bce-qianfan": 3}
+    _DEFAULT_VALIDATION_CONCURRENCY = 5
+    _validation_semaphores: "dict[str, threading.BoundedSemaphore]" = {}
+
+    @staticmethod
+    def _hash_key(api_key: str | None) -> bytes:
+        # 缓存键中只保存密钥摘要
+        return hashlib.sha256((api_key or "").encode()).digest()
+
     @classmethod
     def get_client(cls, provider: str, api_key: str | None = None, base_url: str | None = None) -> LLMClient:
         provider_key = provider.lower().replace(" ", "-")
+        cache_key = (provider_key, cls._hash_key(api_key), base_url or "")
+
+        with cls._cache_lock:
+            client = cls._client_cache.get(cache_key)
+            if client is not None:
+                cls._client_cache.move_to_end(cache_key)
+                return client
+
+        client = cls._create_client(provider_key, api_key, base_url)
+
+        with cls._cache_lock:
+            cls._client_cache[cache_key] = client
+            cls._client_cache.move_to_end(cache_key)
+            while len(cls._client_cache) > cls._CLIENT_CACHE_SIZE:
+                cls._client_cache.popitem(last=False)
+        return client
+
+    @classmethod
+    def validate(cls, provider: str, api_key: str | None = None, base_url: str | None = None) -> Tuple[bool, str]:
+        """
+        校验 API Key（按提供商限制并发，超出上限的调用排队等待）
+
+        Args:
+            provider: 服务提供商
+            api_key: 明文 API Key
+            base_url: API 基础 URL
+
+        Returns:
+            (是否有效, 验证信息)
+        """
+        provider_key = provider.lower().replace(" ", "-")
+        client = cls.get_client(provider, api_key, base_url)
 
+        with cls._cache_lock:
+            semaphore = cls._validation_semaphores.get(provider_key)
+            if semaphore is None:
+                semaphore = cls._validation_semaphores[provider_key] = threading.BoundedSemaphore(
+                    cls._VALIDATION_CONCURRENCY.get(provider_key, cls._DEFAULT_VALIDATION_CONCURRENCY)
+                )
+
+        with semaphore:
+            return client.validate_api_key()
+
+    @classmethod
+    def validate_cached(cls, provider: str, api_key: str | None = None, base_url: str | None = None) -> Tuple[bool, str]:
+        """
+        带 TTL 缓存的 validate_api_key：有效期内直接返回上次结果，不再请求提供商
+
+        Args:
+            provider: 服务提供商
+            api_key: 明文 API Key
+            base_url: API 基础 URL
+
+        Returns:
+            (是否有效, 验证信息)
+        """
+        provider_key = provider.lower().replace(" ", "-")
+        cache_key = (provider_key, cls._hash_key(api_key), base_url or "")
+        now = time.monotonic()
+
+        with cls._cache_lock:
+            cached = cls._validation_cache.get(cache_key)
+            if cached is not None and cached[2] > now:
+                cls._validation_cache.move_to_end(cache_key)
+                return cached[0], cached[1]
+
+        is_valid, message = cls.validate(provider, api_key, base_url)
+
+        ttl = cls._VALIDATION_TTL_SECONDS if is_valid else cls._VALIDATION_NEGATIVE_TTL_SECONDS
+        with cls._cache_lock:
+            cls._validation_cache[cache_key] = (is_valid, message, time.monotonic() + ttl)
+            cls._validation_cache.move_to_end(cache_key)
+            while len(cls._validation_cache) > cls._CLIENT_CACHE_SIZE:
+                cls._validation_cache.popitem(last=False)
+        return is_valid, message
+
+    @classmethod
+    def invalidate(cls, api_key: str | None) -> None:
+        """移除使用该密钥的所有缓存客户端和校验结果（API Key 更新或删除时调用）"""
+        key_hash = cls._hash_key(api_key)
+        with cls._cache_lock:
+            for cache in (cls._client_cache, cls._validation_cache):
+                for cache_key in [k for k in cache if k[1] == key_hash]:
+                    del cache[cache_key]
+
+    @classmethod
+    def _create_client(cls, provider_key: str, api_key: str | None, base_url: str | None) -> LLMClient:
         # 4. 智能决策逻辑
         if provider_key in cls._OPENAI_COMPATIBLE_PROVIDERS:
             client_class = OpenAIClient
@@ -43,7 +163,8 @@ class LLMClientFactory:
             return client_class(
                 api_key=api_key,
                 base_url=base_url,
-                validation_config=validation_config
+                validation_config=validation_config,
+                base64_embeddings=provider_key in cls._BASE64_EMBEDDING_PROVIDERS
             )
 
         client_class = cls._clients.get(provider_key)
@@ -1,14 +1,53 @@
+import logging
+import httpx
+import numpy as np
 import ollama
 from ollama import RequestError
-from .base import LLMClient
+from .base import LLMClient, Embeddings
 from typing import List, Dict, Any, Tuple
 
+logger = logging.getLogger(__name__)
+
+# 本地推理请求多而密集，保持一批长连接复用；超时放宽以容纳模型冷启动加载
+_LIMITS = httpx.Limits(max_keepalive_connections=16, keepalive_expiry=120)
+_TIMEOUT = httpx.Timeout(60.0)
+
+
 class OllamaClient(LLMClient):
     """Ollama Embedding 的具体实现"""
+    def __init__(self, api_key: str | None = None, base_url: str | None = None):
+        super().__init__(api_key, base_url)
+        # SDK 客户端按需创建并复用其连接池（工厂会缓存本实例）
+        self._client: ollama.Client | None = None
+        self._aclient: ollama.AsyncClient | None = None
+
+    def _client_kwargs(self, transport_cls: type) -> Dict[str, Any]:
+        """
+        构造 SDK 内部 httpx 客户端的参数：保持长连接复用；
+        base_url 为 unix:///path/to/ollama.sock 时改走 Unix 域套接字，省去本机 TCP 握手
+        """
+        if self.base_url and self.base_url.startswith("unix://"):
+            return {
+                "host": "http://localhost",
+                "timeout": _TIMEOUT,
+                "transport": transport_cls(uds=self.base_url[len("unix://"):], limits=_LIMITS, retries=0),
+            }
+        return {"host": self.base_url, "timeout": _TIMEOUT, "limits": _LIMITS}
+
+    def _get_client(self) -> ollama.Client:
+        if self._client is None:
+            self._client = ollama.Client(**self._client_kwargs(httpx.HTTPTransport))
+        return self._client
+
+    def _get_async_client(self) -> ollama.AsyncClient:
+        if self._aclient is None:
+            self._aclient = ollama.AsyncClient(**self._client_kwargs(httpx.AsyncHTTPTransport))
+        return self._aclient
+
     def validate_api_key(self) -> Tuple[bool, str]:
         try:
-            client = ollama.Client(host=self.base_url)
-            client.models.list()
+            client = self._get_client()
+            client.list()
             return True, f"Successfully connected to Ollama at {self.base_url or 'default host'}."
         except RequestError as e:
             # 捕获连接失败等特定请求错误
@@ -18,16 +57,36 @@ class OllamaClient(LLMClient):
             return False, f"An unexpected error occurred while connecting to Ollama: {e}"
 
         
-    def create_embeddings(self, texts: List[str], options: Dict[str, Any]) -> List[List[float]]:
-        client = ollama.Client(host=self.base_url)
+    def create_embeddings(self, texts: List[str], options: Dict[str, Any]) -> Embeddings:
+        client = self._get_client()
         
         model = options.get("model")
         if not model:
             raise ValueError("'model' option is required for Ollama Embedding.")
 
         try:
-            # Ollama SDK 需要逐个处理文本，我们用列表推导式来批量完成
-            return [client.embeddings(model=model, prompt=text)['embedding'] for text in texts]
+            # 使用批量接口 embed，按子批次发送，避免逐条请求
+            return self._run_batches(
+                texts, model, options,
+                lambda batch: self._to_array(client.embed(model=model, input=batch)['embeddings'])
+            )
+        except Exception as e:
+            logger.error("Error calling Ollama embedding API: %s", e)
+            raise
+    
+    async def acreate_embeddings(self, texts: List[str], options: Dict[str, Any]) -> Embeddings:
+        client = self._get_async_client()
+        
+        model = options.get("model")
+        if not model:
+            raise ValueError("'model' option is required for Ollama Embedding.")
+
+        async def send(batch: List[str]) -> np.ndarray:
+            response = await client.embed(model=model, input=batch)
+            return self._to_array(response['embeddings'])
+
+        try:
+            return await self._arun_batches(texts, model, options, send)
         except Exception as e:
-            print(f"Error calling Ollama embedding API: {e}")
-            raise
\ No newline at end of file
+            logger.error("Error calling Ollama embedding API: %s", e)
+            raise
@@ -1,24 +1,109 @@
-from openai import OpenAI, AuthenticationError
-from .base import LLMClient
+import asyncio
+import base64
+import logging
+import random
+import time
+from functools import lru_cache
+import numpy as np
+import threading
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient, AuthenticationError, APIStatusError, APIConnectionError, BadRequestError, RateLimitError
+from .base import LLMClient, Embeddings, estimate_tokens
 from typing import List, Dict, Any, Tuple
 
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# 子批次请求的重试策略：最多 6 次尝试，指数退避（带随机抖动）上限 60 秒
+_MAX_ATTEMPTS = 6
+_MAX_BACKOFF_SECONDS = 60.0
+# 校验请求沿用 SDK 默认的重试次数（嵌入请求的重试由 _create_with_retry 负责）
+_VALIDATION_MAX_RETRIES = 2
+
+# 同一 base_url 的所有同步客户端共用一个 HTTP 连接池（鉴权头按请求携带，可跨密钥共享），
+# 同一用户的多个 Key 或多次校验可复用已建立的 TCP/TLS 连接
+_http_clients: Dict[str, DefaultHttpxClient] = {}
+_http_clients_lock = threading.Lock()
+
+
+def _get_http_client(base_url: str | None) -> DefaultHttpxClient:
+    """获取 base_url 对应的共享 HTTP 客户端（进程内常驻，不随 SDK 客户端关闭）"""
+    key = base_url or ""
+    with _http_clients_lock:
+        http_client = _http_clients.get(key)
+        if http_client is None:
+            http_client = _http_clients[key] = DefaultHttpxClient()
+        return http_client
+
+
+@lru_cache(maxsize=32)
+def _get_encoding(model: str):
+    """获取模型对应的 tiktoken 编码器（构造开销大，按模型缓存）；非 OpenAI 模型或编码文件无法加载时返回 None"""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return None
+    except Exception as e:
+        # 编码文件首次使用时需要下载，离线环境下退回字节数估算
+        logger.warning("加载 %s 的 tiktoken 编码失败，改用估算: %s", model, e)
+        return None
+
 class OpenAIClient(LLMClient):
     """
     OpenAI Embedding API 的具体实现.
     同样适用于 硅基流动 (SiliconFlow)、NVIDIA NIM 等 OpenAI 兼容的 API.
     """
-    def __init__(self, api_key: str | None = None, base_url: str | None = None, validation_config: Dict[str, Any] | None = None):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        validation_config: Dict[str, Any] | None = None,
+        base64_embeddings: bool = False
+    ):
         super().__init__(api_key, base_url)
         # 保存注入的验证配置
         self.validation_config = validation_config or {}
+        # 是否以 base64 请求向量（由工厂按提供商开启；服务端拒绝该参数时自动关闭）
+        self.base64_embeddings = base64_embeddings
+        # SDK 客户端按需创建并复用其连接池（工厂会缓存本实例）
+        self._client: OpenAI | None = None
+        self._aclient: AsyncOpenAI | None = None
+    
+    def _get_client(self) -> OpenAI:
+        # 重试由 _create_with_retry 按子批次处理，关闭 SDK 内置重试以免叠加
+        if self._client is None:
+            self._client = OpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                max_retries=0,
+                http_client=_get_http_client(self.base_url)
+            )
+        return self._client
+    
+    def _get_async_client(self) -> AsyncOpenAI:
+        if self._aclient is None:
+            self._aclient = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0)
+        return self._aclient
     
     def validate_api_key(self) -> Tuple[bool, str]:
         """
         根据注入的配置动态执行验证。
         """
         method = self.validation_config.get("method")
+        # 明显格式错误的密钥在本地拒绝，省去一次网络往返
+        if not self.api_key or not self.api_key.strip():
+            return False, "API key is empty."
+        key_pattern = self.validation_config.get("key_pattern")
+        if key_pattern is not None and not key_pattern.fullmatch(self.api_key):
+            return False, "API key is malformed for this provider."
         try:
-            client = OpenAI(api_key=self.api_key, base_url=self.base_url)
+            # 复用缓存的 SDK 客户端及其连接池，不再每次校验新建客户端
+            client = self._get_client().with_options(max_retries=_VALIDATION_MAX_RETRIES)
             
             if method == "list_models":
                 # 为 OpenAI 执行 list_models 验证
@@ -43,23 +128,141 @@ class OpenAIClient(LLMClient):
         except Exception as e:
             return False, f"An error occurred during validation: {e}"
     
-    def create_embeddings(self, texts: List[str], options: Dict[str, Any]) -> List[List[float]]:
-        client = OpenAI(
-            api_key=self.api_key,
-            base_url=self.base_url
-        )
+    def count_tokens(self, texts: List[str], model: str) -> List[int]:
+        """
+        使用 tiktoken 精确计算 token 数；无法获取编码器时取 UTF-8 字节数 / 4 与
+        中日韩字符估算中的较大者（中文每字 3 字节，只按字节数会少算）。
+        """
+        encoding = _get_encoding(model)
+        if encoding is None:
+            return [max(len(text.encode("utf-8")) // 4 + 1, estimate_tokens(text)) for text in texts]
+        return [len(tokens) for tokens in encoding.encode_ordinary_batch(texts)]
+    
+    def split_text(self, text: str, model: str, max_tokens: int, overlap: int = 0) -> List[str]:
+        """
+        有 tiktoken 编码器时按真实 token 切分窗口，否则退回基类的字符估算。
+        """
+        encoding = _get_encoding(model)
+        if encoding is None:
+            return super().split_text(text, model, max_tokens, overlap)
+        
+        tokens = encoding.encode_ordinary(text)
+        if len(tokens) <= max_tokens:
+            return [text]
+        step = max_tokens - min(overlap, max_tokens - 1)
+        return [
+            encoding.decode(tokens[start:start + max_tokens])
+            for start in range(0, len(tokens) - max_tokens + step, step)
+        ]
+    
+    def _is_retryable(self, error: Exception) -> bool:
+        """429、5xx 和连接类错误属于瞬时故障，可重试"""
+        if isinstance(error, APIConnectionError):
+            return True
+        if isinstance(error, APIStatusError):
+            return error.status_code == 429 or error.status_code >= 500
+        return False
+    
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        """计算下一次重试前的等待秒数；限流时优先遵循 Retry-After 响应头"""
+        if isinstance(error, RateLimitError):
+            retry_after = error.response.headers.get("retry-after")
+            try:
+                return min(float(retry_after), _MAX_BACKOFF_SECONDS)
+            except (TypeError, ValueError):
+                pass
+        return random.uniform(0, min(_MAX_BACKOFF_SECONDS, 2 ** attempt))
+    
+    def _decode_response(self, response) -> np.ndarray:
+        """
+        把 embedding 响应解码为 (n, dim) 的可写 float32 数组。
+
+        以 base64 请求时，每个向量是 float32 小端字节串，逐行解码到预先分配的数组中，
+        不为每个分量创建 Python float；忽略该参数的兼容服务仍返回浮点列表，按列表转换。
+        """
+        data = response.data
+        if not data or not isinstance(data[0].embedding, str):
+            return self._to_array([item.embedding for item in data])
+        first = np.frombuffer(base64.b64decode(data[0].embedding), dtype="<f4")
+        embeddings = np.empty((len(data), first.size), dtype=np.float32)
+        embeddings[0] = first
+        for i, item in enumerate(data[1:], start=1):
+            embeddings[i] = np.frombuffer(base64.b64decode(item.embedding), dtype="<f4")
+        return embeddings
+
+    def _embedding_kwargs(self) -> Dict[str, Any]:
+        return {"encoding_format": "base64"} if self.base64_embeddings else {}
+
+    def _disable_base64_if_rejected(self, error: Exception) -> bool:
+        """服务端以 400 拒绝 encoding_format 参数时关闭 base64 请求，返回是否应立即重发"""
+        if not self.base64_embeddings or not isinstance(error, BadRequestError):
+            return False
+        message = str(error).lower()
+        if "encoding_format" not in message and "base64" not in message:
+            return False
+        logger.warning("服务 %s 不支持 base64 格式的向量，改为请求浮点列表", self.base_url)
+        self.base64_embeddings = False
+        return True
+    
+    def _create_with_retry(self, client: OpenAI, model: str, batch: List[str]) -> np.ndarray:
+        """
+        发送单个子批次的 embedding 请求，瞬时故障时按退避策略重试。
+        """
+        for attempt in range(_MAX_ATTEMPTS):
+            try:
+                response = client.embeddings.create(model=model, input=batch, **self._embedding_kwargs())
+                return self._decode_response(response)
+            except Exception as e:
+                if self._disable_base64_if_rejected(e):
+                    return self._decode_response(client.embeddings.create(model=model, input=batch))
+                if attempt == _MAX_ATTEMPTS - 1 or not self._is_retryable(e):
+                    raise
+                time.sleep(self._retry_delay(attempt, e))
+    
+    async def _acreate_with_retry(self, client: AsyncOpenAI, model: str, batch: List[str]) -> np.ndarray:
+        """
+        _create_with_retry 的异步版本，退避等待使用 asyncio.sleep。
+        """
+        for attempt in range(_MAX_ATTEMPTS):
+            try:
+                response = await client.embeddings.create(model=model, input=batch, **self._embedding_kwargs())
+                return self._decode_response(response)
+            except Exception as e:
+                if self._disable_base64_if_rejected(e):
+                    return self._decode_response(await client.embeddings.create(model=model, input=batch))
+                if attempt == _MAX_ATTEMPTS - 1 or not self._is_retryable(e):
+                    raise
+                await asyncio.sleep(self._retry_delay(attempt, e))
+    
+    def create_embeddings(self, texts: List[str], options: Dict[str, Any]) -> Embeddings:
+        client = self._get_client()
+        
+        model = options.get("model")
+        if not model:
+            raise ValueError("'model' option is required for OpenAI Embedding.")
+
+        try:
+            # 按 token 上限切分子批次（避免单个请求超出提供商限制被拒绝），并发发送
+            return self._run_batches(
+                texts, model, options,
+                lambda batch: self._create_with_retry(client, model, batch)
+            )
+        except Exception as e:
+            logger.error("Error calling OpenAI compatible embedding API: %s", e)
+            raise
+    
+    async def acreate_embeddings(self, texts: List[str], options: Dict[str, Any]) -> Embeddings:
+        client = self._get_async_client()
         
         model = options.get("model")
         if not model:
             raise ValueError("'model' option is required for OpenAI Embedding.")
 
         try:
-            response = client.embeddings.create(
-                model=model,
-                input=texts
+            return await self._arun_batches(
+                texts, model, options,
+                lambda batch: self._acreate_with_retry(client, model, batch)
             )
-            # 从响应中提取 embedding 列表
-            return [item.embedding for item in response.data]
         except Exception as e:
-            print(f"Error calling OpenAI compatible embedding API: {e}")
-            raise
\ No newline at end of file
+            logger.error("Error calling OpenAI compatible embedding API: %s", e)
+            raise
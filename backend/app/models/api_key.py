@@ -1,6 +1,6 @@
 # backend/app/models/api_key.py
 
-from sqlalchemy import String, Integer, Text, ForeignKey, text, UniqueConstraint, DateTime, CheckConstraint
+from sqlalchemy import String, Integer, Text, ForeignKey, text, func, UniqueConstraint, DateTime, CheckConstraint, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
@@ -122,12 +122,15 @@ class ApiKey(Base, TimestampMixin):
             "status IN ('active', 'inactive')", 
             name='ck_api_key_status'
         ),
+        # 按提供商取活跃 Key（provider = ? AND status = 'active'）走单次索引查找
+        Index('ix_api_keys_provider_status', 'provider', 'status'),
     )
     
     # 关系映射
-    user = relationship("User", back_populates="api_keys")
+    user = relationship("User", back_populates="api_keys", lazy="raise_on_sql")  # 禁止隐式懒加载，避免 N+1
     
-    def generate_key_preview(self, api_key: str) -> str:
+    @staticmethod
+    def generate_key_preview(api_key: str) -> str:
         """
         生成 API Key 的安全预览格式
         
@@ -139,15 +142,7 @@ class ApiKey(Base, TimestampMixin):
         """
         if len(api_key) < 10:
             return "****"
-        return f"{api_key[:6]}****...****{api_key[-4:]}"
-    
-    def update_last_used(self) -> None:
-        """
-        更新最后使用时间和使用次数
-        调用此方法后需要手动提交数据库事务
-        """
-        self.last_used_at = datetime.utcnow()
-        self.usage_count += 1
+        return "".join((api_key[:6], "****...****", api_key[-4:]))
     
     def update_test_result(self, success: bool, message: str, response_time: float | None = None) -> None:
         """
@@ -158,7 +153,7 @@ class ApiKey(Base, TimestampMixin):
             message: 测试消息
             response_time: 响应时间（毫秒），可选
         """
-        self.last_tested_at = datetime.utcnow()
+        self.last_tested_at = func.now()
         self.test_status = "success" if success else "failed"
         self.test_message = message
         self.test_response_time = response_time
@@ -1,6 +1,6 @@
 # backend/app/models/milvus_connection.py
 
-from sqlalchemy import String, Integer, Text, ForeignKey, text, UniqueConstraint, DateTime, CheckConstraint
+from sqlalchemy import String, Integer, Text, ForeignKey, text, func, UniqueConstraint, DateTime, CheckConstraint, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
@@ -66,6 +66,12 @@ class MilvusConnection(Base, TimestampMixin):
         comment="使用 AES 对称加密存储的认证 token（必填，格式：token 或 username:password）"
     )
     
+    token_preview: Mapped[str | None] = mapped_column(
+        String(50),
+        nullable=True,
+        comment="认证 token 的脱敏预览，创建时生成，列表展示无需解密"
+    )
+    
     
     # 状态管理
     status: Mapped[str] = mapped_column(
@@ -123,19 +129,49 @@ class MilvusConnection(Base, TimestampMixin):
             "status IN ('active', 'inactive')", 
             name='ck_milvus_connection_status'
         ),
+        # 列表接口：按用户（和状态）过滤、按创建时间倒序分页
+        Index('ix_milvus_connections_user_status_created', 'user_id', 'status', text('created_at DESC')),
     )
     
     # 关系映射
-    user = relationship("User", back_populates="milvus_connections")
+    user = relationship("User", back_populates="milvus_connections", lazy="raise_on_sql")  # 禁止隐式懒加载，避免 N+1
+    
+    @staticmethod
+    def generate_token_preview(token: str) -> str:
+        """
+        生成认证 token 的脱敏预览，便于用户识别但不泄露完整凭据
+        
+        Args:
+            token: 明文 token（token 或 username:password）
+            
+        Returns:
+            username:password 格式只显示用户名；纯 token 显示首尾部分
+        """
+        # 如果是 username:password 格式，只显示用户名
+        if ':' in token:
+            username = token.partition(':')[0]
+            # 如果用户名过长，也进行截断
+            if len(username) > 20:
+                return f"{username[:15]}...***"
+            return f"{username}:***"
+        
+        # 纯 token，显示首尾部分
+        if len(token) <= 8:
+            return "***token***"
+        elif len(token) <= 16:
+            return f"{token[:3]}***{token[-3:]}"
+        return f"{token[:6]}***{token[-4:]}"
     
     
     def update_last_used(self) -> None:
         """
         更新最后使用时间和使用次数
         调用此方法后需要手动提交数据库事务
+
+        时间戳由数据库 now() 生成，计数在 SQL 中原子自增（UPDATE ... SET usage_count = usage_count + 1）
         """
-        self.last_used_at = datetime.utcnow()
-        self.usage_count += 1
+        self.last_used_at = func.now()
+        self.usage_count = MilvusConnection.usage_count + 1
     
     def update_test_result(self, success: bool, message: str, response_time: float | None = None) -> None:
         """
@@ -146,7 +182,7 @@ class MilvusConnection(Base, TimestampMixin):
             message: 测试消息
             response_time: 响应时间（毫秒），可选
         """
-        self.last_tested_at = datetime.utcnow()
+        self.last_tested_at = func.now()
         self.test_status = "success" if success else "failed"
         self.test_message = message
         self.test_response_time = response_time
@@ -23,5 +23,12 @@ class User(Base, TimestampMixin):
     is_active: Mapped[bool] = mapped_column(Boolean, server_default="true", nullable=False)
     
     # 关系映射 - 一个用户可以有多个 API Key 和 Milvus 连接
-    api_keys = relationship("ApiKey", back_populates="user", cascade="all, delete-orphan")
-    milvus_connections = relationship("MilvusConnection", back_populates="user", cascade="all, delete-orphan")
\ No newline at end of file
+    # 禁止隐式懒加载（需要时显式 selectinload），删除用户时由数据库外键 ON DELETE CASCADE 清理子表
+    api_keys = relationship(
+        "ApiKey", back_populates="user", cascade="all, delete-orphan",
+        lazy="raise_on_sql", passive_deletes=True
+    )
+    milvus_connections = relationship(
+        "MilvusConnection", back_populates="user", cascade="all, delete-orphan",
+        lazy="raise_on_sql", passive_deletes=True
+    )
\ No newline at end of file
@@ -1,11 +1,13 @@
 # backend/app/schemas/api_key.py
 
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional, get_args
 from uuid import UUID
 from enum import Enum
 from pydantic import BaseModel, Field, ConfigDict
 
+from app.schemas.common import Page
+
 
 class ApiProvider(str, Enum):
     """API 服务提供商枚举"""
@@ -16,29 +18,40 @@ class ApiProvider(str, Enum):
     OLLAMA = "ollama"
 
 
+# 请求/响应模型中使用的供应商类型（与 ApiProvider 取值一致），校验和序列化都直接按字符串处理
+ApiProviderT = Literal["openai", "siliconflow", "bce-qianfan", "nvidia-nim", "ollama"]
+API_PROVIDERS: tuple[str, ...] = get_args(ApiProviderT)
+
+
 class ApiKeyBase(BaseModel):
     """API Key 基础模式"""
+    model_config = ConfigDict(defer_build=True)
+    
     name: str = Field(..., min_length=1, max_length=255, description="API Key 名称")
-    provider: ApiProvider = Field(..., description="服务提供商")
+    provider: ApiProviderT = Field(..., description="服务提供商")
     base_url: str = Field(..., min_length=1, max_length=500, description="API 基础 URL")
 
 
 class ApiKeyCreate(ApiKeyBase):
     """创建 API Key 请求模式"""
+    model_config = ConfigDict(defer_build=True, extra='forbid')
+    
     encrypted_api_key: str = Field(..., description="前端 RSA 加密后的 API Key")
 
 
 class ApiKeyUpdate(BaseModel):
     """更新 API Key 请求模式"""
+    model_config = ConfigDict(defer_build=True, extra='forbid')
+    
     name: Optional[str] = Field(None, min_length=1, max_length=255, description="API Key 名称")
-    provider: Optional[ApiProvider] = Field(None, description="服务提供商")
+    provider: Optional[ApiProviderT] = Field(None, description="服务提供商")
     base_url: Optional[str] = Field(None, min_length=1, max_length=500, description="API 基础 URL")
-    status: Optional[str] = Field(None, pattern="^(active|inactive)$", description="API Key 状态")
+    status: Optional[Literal["active", "inactive"]] = Field(None, description="API Key 状态")
 
 
 class ApiKeyInDB(ApiKeyBase):
     """数据库中的 API Key 模式"""
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True, defer_build=True)
     
     id: UUID
     user_id: UUID
@@ -55,41 +68,31 @@ class ApiKeyInDB(ApiKeyBase):
     updated_at: datetime
 
 
-class ApiKeyResponse(ApiKeyInDB):
-    """API Key 响应模式（客户端返回）"""
-    pass
+# API Key 响应模式（客户端返回），字段与 ApiKeyInDB 完全一致，直接复用同一个模型
+ApiKeyResponse = ApiKeyInDB
 
 
-class ApiKeyList(BaseModel):
+class ApiKeyList(Page[ApiKeyResponse]):
     """API Key 列表响应"""
-    items: list[ApiKeyResponse]
-    total: int
-    page: int
-    size: int
-    pages: int
+    pass
 
 
-class ApiKeyCreateResponse(BaseModel):
+class ApiKeyCreateResponse(ApiKeyResponse):
     """创建 API Key 成功响应"""
-    id: UUID
-    name: str
-    provider: str
-    base_url: str
-    key_preview: str
-    status: str
-    usage_count: int
-    created_at: datetime
-    updated_at: datetime
     message: str = "API Key 创建成功"
 
 
 class ApiKeyTestRequest(BaseModel):
     """测试 API Key 请求"""
+    model_config = ConfigDict(defer_build=True)
+    
     test_endpoint: Optional[str] = Field(None, description="测试端点路径")
 
 
 class ApiKeyTestResponse(BaseModel):
     """测试 API Key 响应"""
+    model_config = ConfigDict(frozen=True, defer_build=True)
+    
     success: bool
     message: str
     response_time_ms: Optional[float] = None
@@ -99,4 +102,6 @@ class ApiKeyTestResponse(BaseModel):
 
 class ApiProviderListResponse(BaseModel):
     """API 供应商列表响应"""
+    model_config = ConfigDict(defer_build=True)
+    
     providers: list[str] = Field(..., description="支持的API供应商列表")
@@ -0,0 +1,17 @@
+# backend/app/schemas/common.py
+
+from typing import Generic, TypeVar
+from pydantic import BaseModel, ConfigDict
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """通用分页列表响应"""
+    model_config = ConfigDict(defer_build=True)
+    
+    items: list[T]
+    total: int
+    page: int
+    size: int
+    pages: int
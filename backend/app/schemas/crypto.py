@@ -1,8 +1,10 @@
 # backend/app/schemas/crypto.py
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class RSAPublicKeyResponse(BaseModel):
     """RSA 公钥响应 - 简化版本"""
+    model_config = ConfigDict(defer_build=True)
+    
     public_key: str = Field(..., description="PEM 格式的 RSA 公钥，用于前端加密 API Key")
@@ -0,0 +1,38 @@
+# backend/app/schemas/embedding.py
+
+from uuid import UUID
+from pydantic import BaseModel, Field, ConfigDict
+
+
+class EmbeddingCreateRequest(BaseModel):
+    """生成 embedding 请求"""
+    model_config = ConfigDict(defer_build=True, extra='forbid')
+    
+    api_key_id: UUID = Field(..., description="使用的 API Key ID")
+    model: str = Field(..., min_length=1, max_length=255, description="embedding 模型名称")
+    texts: list[str] = Field(..., min_length=1, description="需要向量化的文本列表")
+
+
+class EmbeddingCreateResponse(BaseModel):
+    """生成 embedding 响应"""
+    model_config = ConfigDict(frozen=True, defer_build=True)
+    
+    model: str
+    count: int = Field(..., description="向量个数")
+    dimension: int = Field(..., description="向量维度")
+    embeddings: list[list[float]] = Field(..., description="与输入文本一一对应的向量")
+
+
+class EmbeddingModelListResponse(BaseModel):
+    """可用 embedding 模型列表响应"""
+    model_config = ConfigDict(frozen=True, defer_build=True)
+    
+    models: list[str] = Field(..., description="API Key 对应提供商支持的模型")
+
+
+class EmbeddingKeyValidationResponse(BaseModel):
+    """API Key 可用性校验响应"""
+    model_config = ConfigDict(frozen=True, defer_build=True)
+    
+    success: bool = Field(..., description="API Key 是否能正常调用提供商")
+    message: str = Field(..., description="校验信息")
@@ -1,75 +1,90 @@
 # backend/app/schemas/milvus_connection.py
 
+import re
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 from uuid import UUID
-from pydantic import BaseModel, Field, ConfigDict, validator
+from functools import cached_property
+from pydantic import BaseModel, Field, ConfigDict, computed_field, field_validator
 from urllib.parse import urlparse
 
+from app.schemas.common import Page
+
+
+# 常见 URI（http(s)://host[:port][/path]）的快速匹配；不匹配时再回退到 urlparse 做精确校验。
+# 主机名中不允许出现方括号，IPv6 地址（含格式错误的）一律交给 urlparse 判断
+_URI_RE = re.compile(r'^(https?)://([^:/?#\[\]\s]+)(?::\d+)?(?:/[^\s]*)?$')
+
+
+def _validate_uri(v: str) -> str:
+    """校验 Milvus 连接 URI：必须是包含协议和主机的完整 http/https 地址"""
+    if _URI_RE.match(v):
+        return v
+
+    try:
+        parsed = urlparse(v)
+    except ValueError as e:
+        raise ValueError(f'无效的 URI 格式: {str(e)}')
+    if not parsed.scheme or not parsed.netloc:
+        raise ValueError('URI 必须是完整的地址，包含协议（如 http://localhost:19530 或 https://your-cluster.vectordb.zillizcloud.com）')
+    if parsed.scheme not in ['http', 'https']:
+        raise ValueError('协议必须是 http 或 https')
+    
+    return v
+
+
+def _build_connection_string(uri: str, database_name: Optional[str]) -> str:
+    """生成连接字符串用于显示（不包含敏感信息），格式：uri[/database]"""
+    return f"{uri}/{database_name}" if database_name else uri
+
 
 class MilvusConnectionBase(BaseModel):
     """Milvus 连接配置基础模式"""
+    model_config = ConfigDict(defer_build=True)
+    
     name: str = Field(..., min_length=1, max_length=255, description="连接配置名称")
     description: Optional[str] = Field(None, max_length=500, description="连接配置描述")
     uri: str = Field(..., min_length=1, max_length=500, description="Milvus 连接 URI（完整地址，含协议和端口）")
     database_name: str = Field(..., min_length=1, max_length=255, description="数据库名称（必填）")
     
-    @validator('uri')
+    @field_validator('uri', mode='after')
+    @classmethod
     def validate_uri_format(cls, v):
         """验证 URI 格式"""
         if not v:
             raise ValueError('连接 URI 不能为空')
-        
-        try:
-            parsed = urlparse(v)
-            if not parsed.scheme or not parsed.netloc:
-                raise ValueError('URI 必须是完整的地址，包含协议（如 http://localhost:19530 或 https://your-cluster.vectordb.zillizcloud.com）')
-            if parsed.scheme not in ['http', 'https']:
-                raise ValueError('协议必须是 http 或 https')
-        except Exception as e:
-            if isinstance(e, ValueError):
-                raise e
-            raise ValueError(f'无效的 URI 格式: {str(e)}')
-        
-        return v
+        return _validate_uri(v)
 
 
 class MilvusConnectionCreate(MilvusConnectionBase):
     """创建 Milvus 连接请求模式"""
+    model_config = ConfigDict(defer_build=True, extra='forbid')
+    
     encrypted_token: str = Field(..., description="前端 RSA 加密后的认证 token（必填，格式：token 或 username:password）")
 
 
 class MilvusConnectionUpdate(BaseModel):
     """更新 Milvus 连接请求模式"""
+    model_config = ConfigDict(defer_build=True, extra='forbid')
+    
     name: Optional[str] = Field(None, min_length=1, max_length=255, description="连接配置名称")
     description: Optional[str] = Field(None, max_length=500, description="连接配置描述")
     uri: Optional[str] = Field(None, min_length=1, max_length=500, description="Milvus 连接 URI")
     database_name: Optional[str] = Field(None, min_length=1, max_length=255, description="数据库名称")
-    status: Optional[str] = Field(None, pattern="^(active|inactive)$", description="连接状态")
+    status: Optional[Literal["active", "inactive"]] = Field(None, description="连接状态")
     
-    @validator('uri')
+    @field_validator('uri', mode='after')
+    @classmethod
     def validate_uri_format(cls, v):
         """验证 URI 格式"""
         if v is None:
             return v
-            
-        try:
-            parsed = urlparse(v)
-            if not parsed.scheme or not parsed.netloc:
-                raise ValueError('URI 必须是完整的地址，包含协议（如 http://localhost:19530 或 https://your-cluster.vectordb.zillizcloud.com）')
-            if parsed.scheme not in ['http', 'https']:
-                raise ValueError('协议必须是 http 或 https')
-        except Exception as e:
-            if isinstance(e, ValueError):
-                raise e
-            raise ValueError(f'无效的 URI 格式: {str(e)}')
-        
-        return v
+        return _validate_uri(v)
 
 
 class MilvusConnectionInDB(MilvusConnectionBase):
     """数据库中的 Milvus 连接模式"""
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, defer_build=True)
     
     id: UUID
     user_id: UUID
@@ -88,41 +103,36 @@ class MilvusConnectionInDB(MilvusConnectionBase):
 
 class MilvusConnectionResponse(MilvusConnectionInDB):
     """Milvus 连接响应模式（客户端返回）"""
-    connection_string: str = Field(..., description="连接字符串（不含敏感信息）")
+    model_config = ConfigDict(from_attributes=True, frozen=True, defer_build=True)
+
+    @computed_field(description="连接字符串（不含敏感信息）")
+    @cached_property
+    def connection_string(self) -> str:
+        return _build_connection_string(self.uri, self.database_name)
 
 
-class MilvusConnectionList(BaseModel):
+class MilvusConnectionList(Page[MilvusConnectionResponse]):
     """Milvus 连接列表响应"""
-    items: list[MilvusConnectionResponse]
-    total: int
-    page: int
-    size: int
-    pages: int
+    pass
 
 
-class MilvusConnectionCreateResponse(BaseModel):
+class MilvusConnectionCreateResponse(MilvusConnectionResponse):
     """创建 Milvus 连接成功响应"""
-    id: UUID
-    name: str
-    description: Optional[str]
-    uri: str
-    database_name: str
-    token_info: str
-    status: str
-    usage_count: int
-    connection_string: str
-    created_at: datetime
-    updated_at: datetime
     message: str = "Milvus 连接配置创建成功"
 
 
 class MilvusConnectionTestRequest(BaseModel):
     """测试 Milvus 连接请求"""
+    model_config = ConfigDict(defer_build=True)
+    
     timeout_seconds: Optional[int] = Field(10, ge=1, le=60, description="连接超时时间（秒）")
+    cache_ttl_seconds: int = Field(0, ge=0, le=3600, description="上次测试成功且在该秒数内时直接返回上次结果，0 表示强制重新测试")
 
 
 class MilvusConnectionTestResponse(BaseModel):
     """测试 Milvus 连接响应"""
+    model_config = ConfigDict(frozen=True, defer_build=True)
+    
     success: bool
     message: str
     response_time_ms: Optional[float] = None
@@ -131,10 +141,20 @@ class MilvusConnectionTestResponse(BaseModel):
     collections_count: Optional[int] = Field(None, description="数据库中的集合数量")
 
 
+class MilvusConnectionStatusBreakdown(BaseModel):
+    """按状态分组的连接数（状态受数据库约束，只有 active/inactive 两种）"""
+    model_config = ConfigDict(frozen=True, defer_build=True)
+    
+    active: int = 0
+    inactive: int = 0
+
+
 class MilvusConnectionStatsResponse(BaseModel):
     """Milvus 连接统计响应"""
+    model_config = ConfigDict(frozen=True, defer_build=True)
+    
     total: int = Field(..., description="总连接数")
     active: int = Field(..., description="活跃连接数")
     inactive: int = Field(..., description="非活跃连接数")
     recently_used: int = Field(..., description="最近使用的连接数（7天内）")
-    by_status: dict[str, int] = Field(..., description="按状态分组统计")
+    by_status: MilvusConnectionStatusBreakdown = Field(..., description="按状态分组统计")
@@ -1,12 +1,14 @@
 from typing import Optional
 from uuid import UUID
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 from datetime import datetime
 
 
 # --- 用户基础 Schema ---
 class UserBase(BaseModel):
     """用户的基础字段"""
+    model_config = ConfigDict(defer_build=True)
+    
     email: EmailStr
     full_name: Optional[str] = None
 
@@ -20,6 +22,8 @@ class UserCreate(UserBase):
 # --- 用户更新 Schema ---
 class UserUpdate(BaseModel):
     """更新用户时可选的字段"""
+    model_config = ConfigDict(defer_build=True)
+    
     email: Optional[EmailStr] = None
     full_name: Optional[str] = None
     password: Optional[str] = None
@@ -29,36 +33,38 @@ class UserUpdate(BaseModel):
 # --- 数据库中的用户 Schema ---
 class UserInDB(UserBase):
     """数据库中用户的完整信息(包含敏感字段)"""
+    model_config = ConfigDict(from_attributes=True, defer_build=True)
+    
     id: UUID
     hashed_password: str
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
-
 
 # --- 返回给前端的用户 Schema ---
 class User(UserBase):
     """返回给前端的用户信息(不包含敏感字段)"""
+    model_config = ConfigDict(from_attributes=True, frozen=True, defer_build=True)
+    
     id: UUID
     is_active: bool  # 只在响应中显示，不允许用户修改
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
-
 
 # --- 认证相关 Schema ---
 class Token(BaseModel):
     """JWT Token 响应"""
+    model_config = ConfigDict(frozen=True, defer_build=True)
+    
     access_token: str
     token_type: str = "bearer"
 
 
 class LoginResponse(BaseModel):
     """登录响应 - 包含Token和基本用户信息"""
+    model_config = ConfigDict(defer_build=True)
+    
     access_token: str
     token_type: str = "bearer"
     email: EmailStr
@@ -67,11 +73,15 @@ class LoginResponse(BaseModel):
 
 class TokenData(BaseModel):
     """Token 中携带的数据"""
+    model_config = ConfigDict(defer_build=True)
+    
     email: Optional[str] = None
 
 
 class UserLogin(BaseModel):
     """用户登录请求"""
+    model_config = ConfigDict(defer_build=True)
+    
     email: EmailStr
     password: str
 
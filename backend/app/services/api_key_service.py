@@ -4,14 +4,16 @@ from typing import List, Dict, Any, Optional, Tuple
 from uuid import UUID
 import logging
 import asyncio
+import time
 import threading
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.crud.api_key import api_key_crud
 from app.models.api_key import ApiKey
-from app.schemas.api_key import ApiKeyCreate, ApiKeyUpdate
+from app.schemas.api_key import ApiKeyCreate, ApiKeyUpdate, ApiKeyResponse
 from app.llm_clients.factory import LLMClientFactory
-from app.core.db import get_db
+from app.core.db import get_db, SessionLocal
 
 logger = logging.getLogger(__name__)
 
@@ -45,7 +47,7 @@ class ApiKeyService:
         user_id: UUID,
         api_key_data: ApiKeyCreate,
         db: Session
-    ) -> Dict[str, Any]:
+    ) -> ApiKeyResponse:
         """
         创建新的 API Key
         
@@ -61,23 +63,18 @@ class ApiKeyService:
             ApiKeyServiceError: 创建失败时
         """
         try:
-            # 检查名称是否重复
-            existing_key = api_key_crud.get_by_name(
-                db=db, name=api_key_data.name, user_id=user_id
+            # 创建 API Key（名称重复时不会插入，返回 None）
+            api_key_obj = api_key_crud.create(
+                db=db, obj_in=api_key_data, user_id=user_id
             )
-            if existing_key:
+            if api_key_obj is None:
                 raise ApiKeyServiceError(
                     f"API Key 名称 '{api_key_data.name}' 已存在",
                     "DUPLICATE_NAME"
                 )
             
-            # 创建 API Key
-            api_key_obj = api_key_crud.create(
-                db=db, obj_in=api_key_data, user_id=user_id
-            )
-            
             # 异步测试新创建的 API Key（不阻塞响应）
-            logger.info(f"启动异步测试 - API Key: {api_key_obj.name}")
+            logger.info("启动异步测试 - API Key: %s", api_key_obj.name)
             self.async_test_api_key(api_key_obj.id, user_id)
             
             # 返回安全信息
@@ -86,7 +83,7 @@ class ApiKeyService:
         except ApiKeyServiceError:
             raise
         except Exception as e:
-            logger.error(f"创建 API Key 失败: {e}", exc_info=True)
+            logger.error("创建 API Key 失败: %s", e, exc_info=True)
             raise ApiKeyServiceError(
                 f"创建 API Key 失败: {str(e)}",
                 "CREATE_ERROR"
@@ -134,7 +131,7 @@ class ApiKeyService:
             }
             
         except Exception as e:
-            logger.error(f"获取用户 API Key 列表失败: {e}", exc_info=True)
+            logger.error("获取用户 API Key 列表失败: %s", e, exc_info=True)
             raise ApiKeyServiceError(
                 f"获取 API Key 列表失败: {str(e)}",
                 "GET_LIST_ERROR"
@@ -146,7 +143,7 @@ class ApiKeyService:
         api_key_id: UUID,
         user_id: UUID,
         db: Session
-    ) -> Dict[str, Any]:
+    ) -> ApiKeyResponse:
         """
         获取单个 API Key 信息
         
@@ -171,7 +168,7 @@ class ApiKeyService:
         except ApiKeyServiceError:
             raise
         except Exception as e:
-            logger.error(f"获取 API Key 失败: {e}", exc_info=True)
+            logger.error("获取 API Key 失败: %s", e, exc_info=True)
             raise ApiKeyServiceError(
                 f"获取 API Key 失败: {str(e)}",
                 "GET_ERROR"
@@ -184,7 +181,7 @@ class ApiKeyService:
         user_id: UUID,
         update_data: ApiKeyUpdate,
         db: Session
-    ) -> Dict[str, Any]:
+    ) -> ApiKeyResponse:
         """
         更新 API Key
         
@@ -198,36 +195,35 @@ class ApiKeyService:
             更新后的 API Key 信息
         """
         try:
-            # 获取现有 API Key
-            api_key_obj = api_key_crud.get(db=db, id=api_key_id, user_id=user_id)
-            if not api_key_obj:
-                raise ApiKeyServiceError(
-                    f"API Key 不存在或您无权访问: {api_key_id}",
-                    "NOT_FOUND"
-                )
-            
-            # 检查名称重复（如果要更新名称）
-            if update_data.name and update_data.name != api_key_obj.name:
-                existing_key = api_key_crud.get_by_name(
-                    db=db, name=update_data.name, user_id=user_id
+            # 更新并回读 API Key（名称重复由数据库唯一约束 uq_user_api_key_name 拦截）
+            try:
+                updated_key = api_key_crud.update_by_id(
+                    db=db, id=api_key_id, user_id=user_id, obj_in=update_data
                 )
-                if existing_key:
+            except IntegrityError as e:
+                if "uq_user_api_key_name" in str(e.orig):
                     raise ApiKeyServiceError(
                         f"API Key 名称 '{update_data.name}' 已存在",
                         "DUPLICATE_NAME"
                     )
+                raise
             
-            # 更新 API Key
-            updated_key = api_key_crud.update(
-                db=db, db_obj=api_key_obj, obj_in=update_data
-            )
+            if not updated_key:
+                raise ApiKeyServiceError(
+                    f"API Key 不存在或您无权访问: {api_key_id}",
+                    "NOT_FOUND"
+                )
+            
+            # 提供商、地址或状态变化后，旧的缓存客户端和校验结果不再适用
+            if update_data.model_fields_set & {"provider", "base_url", "status"}:
+                self._invalidate_cached_clients(updated_key.encrypted_api_key)
             
             return self._format_api_key_response(updated_key)
             
         except ApiKeyServiceError:
             raise
         except Exception as e:
-            logger.error(f"更新 API Key 失败: {e}", exc_info=True)
+            logger.error("更新 API Key 失败: %s", e, exc_info=True)
             raise ApiKeyServiceError(
                 f"更新 API Key 失败: {str(e)}",
                 "UPDATE_ERROR"
@@ -252,20 +248,25 @@ class ApiKeyService:
             是否删除成功
         """
         try:
-            success = api_key_crud.delete(db=db, id=api_key_id, user_id=user_id)
-            if not success:
+            # 删除语句直接返回密文，用于清理缓存的客户端、校验结果和解密后的明文
+            encrypted_key = api_key_crud.delete_returning_encrypted_key(
+                db=db, id=api_key_id, user_id=user_id
+            )
+            if encrypted_key is None:
                 raise ApiKeyServiceError(
                     f"API Key 不存在或您无权删除: {api_key_id}",
                     "NOT_FOUND"
                 )
+            self._invalidate_cached_clients(encrypted_key)
+            api_key_crud.forget_plaintext_key(encrypted_key=encrypted_key)
             
-            logger.info(f"成功删除 API Key: {api_key_id}")
+            logger.info("成功删除 API Key: %s", api_key_id)
             return True
             
         except ApiKeyServiceError:
             raise
         except Exception as e:
-            logger.error(f"删除 API Key 失败: {e}", exc_info=True)
+            logger.error("删除 API Key 失败: %s", e, exc_info=True)
             raise ApiKeyServiceError(
                 f"删除 API Key 失败: {str(e)}",
                 "DELETE_ERROR"
@@ -291,8 +292,7 @@ class ApiKeyService:
         Returns:
             (是否有效, 验证信息, 响应时间ms)
         """
-        import time
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         try:
             # 获取 API Key
@@ -301,7 +301,7 @@ class ApiKeyService:
                 return False, "API Key 不存在或您无权访问", None
             
             if not api_key_obj.is_active():
-                response_time = (time.time() - start_time) * 1000
+                response_time = (time.perf_counter_ns() - start_ns) / 1_000_000
                 if save_result:
                     api_key_obj.update_test_result(False, "API Key 已被禁用", response_time)
                     db.commit()
@@ -312,15 +312,13 @@ class ApiKeyService:
                 encrypted_key=api_key_obj.encrypted_api_key
             )
             
-            # 创建客户端并验证
-            client = LLMClientFactory.get_client(
+            # 创建客户端并验证（按提供商限制并发）
+            is_valid, message = LLMClientFactory.validate(
                 provider=api_key_obj.provider,
                 api_key=plaintext_key,
                 base_url=api_key_obj.base_url
             )
-            
-            is_valid, message = client.validate_api_key()
-            response_time = (time.time() - start_time) * 1000
+            response_time = (time.perf_counter_ns() - start_ns) / 1_000_000
             
             # 保存测试结果
             if save_result:
@@ -328,14 +326,14 @@ class ApiKeyService:
                 db.commit()
             
             if is_valid:
-                logger.info(f"API Key 验证成功: {api_key_obj.name}")
+                logger.info("API Key 验证成功: %s", api_key_obj.name)
             else:
-                logger.warning(f"API Key 验证失败: {api_key_obj.name}, 原因: {message}")
+                logger.warning("API Key 验证失败: %s, 原因: %s", api_key_obj.name, message)
             
             return is_valid, message, response_time
             
         except Exception as e:
-            response_time = (time.time() - start_time) * 1000
+            response_time = (time.perf_counter_ns() - start_ns) / 1_000_000
             error_message = f"验证过程中发生错误: {str(e)}"
             
             # 保存错误结果
@@ -348,7 +346,7 @@ class ApiKeyService:
                 except:
                     pass  # 避免在保存错误时再次出错
             
-            logger.error(f"API Key 验证过程中发生错误: {e}", exc_info=True)
+            logger.error("API Key 验证过程中发生错误: %s", e, exc_info=True)
             return False, error_message, response_time
     
     def async_test_api_key(self, api_key_id: UUID, user_id: UUID) -> None:
@@ -362,7 +360,6 @@ class ApiKeyService:
         def test_in_background():
             try:
                 # 创建新的数据库会话用于后台任务
-                from app.core.db import SessionLocal
                 db = SessionLocal()
                 
                 try:
@@ -374,13 +371,13 @@ class ApiKeyService:
                         save_result=True
                     )
                     
-                    logger.info(f"异步测试完成 - API Key: {api_key_id}, 结果: {'成功' if is_valid else '失败'}")
+                    logger.info("异步测试完成 - API Key: %s, 结果: %s", api_key_id, '成功' if is_valid else '失败')
                     
                 finally:
                     db.close()
                     
             except Exception as e:
-                logger.error(f"异步测试 API Key 失败: {e}", exc_info=True)
+                logger.error("异步测试 API Key 失败: %s", e, exc_info=True)
         
         # 在后台线程中执行测试
         thread = threading.Thread(target=test_in_background, daemon=True)
@@ -407,40 +404,39 @@ class ApiKeyService:
             return stats
             
         except Exception as e:
-            logger.error(f"获取用户统计信息失败: {e}", exc_info=True)
+            logger.error("获取用户统计信息失败: %s", e, exc_info=True)
             raise ApiKeyServiceError(
                 f"获取统计信息失败: {str(e)}",
                 "STATS_ERROR"
             )
     
-    def _format_api_key_response(self, api_key_obj: ApiKey) -> Dict[str, Any]:
+    def _format_api_key_response(self, api_key_obj: ApiKey) -> ApiKeyResponse:
         """
         格式化 API Key 响应数据（安全格式，不包含敏感信息）
         
+        由 pydantic-core 直接按属性读取 ORM 对象，不经过中间字典
+        
         Args:
             api_key_obj: API Key 数据库对象
             
         Returns:
-            格式化的响应数据
+            API Key 响应模型
+        """
+        return ApiKeyResponse.model_validate(api_key_obj)
+
+    def _invalidate_cached_clients(self, encrypted_key: str) -> None:
+        """
+        清理工厂中使用该密钥的缓存客户端和校验结果（解密失败时记录警告，不影响调用方）
+
+        Args:
+            encrypted_key: 数据库中的加密密钥
         """
-        return {
-            "id": api_key_obj.id,                # 保持 UUID 类型
-            "user_id": api_key_obj.user_id,      # 添加缺失的 user_id
-            "name": api_key_obj.name,
-            "provider": api_key_obj.provider,
-            "base_url": api_key_obj.base_url,
-            "key_preview": api_key_obj.key_preview,
-            "status": api_key_obj.status,
-            "last_used_at": api_key_obj.last_used_at,  # 保持 datetime 类型
-            "usage_count": api_key_obj.usage_count,
-            # 测试相关字段
-            "last_tested_at": api_key_obj.last_tested_at,
-            "test_status": api_key_obj.test_status,
-            "test_message": api_key_obj.test_message,
-            "test_response_time": api_key_obj.test_response_time,
-            "created_at": api_key_obj.created_at,      # 保持 datetime 类型
-            "updated_at": api_key_obj.updated_at       # 保持 datetime 类型
-        }
+        try:
+            plaintext_key = api_key_crud.get_plaintext_key(encrypted_key=encrypted_key)
+        except Exception as e:
+            logger.warning("解密 API Key 失败，跳过清理缓存客户端: %s", e)
+            return
+        LLMClientFactory.invalidate(plaintext_key)
 
 
 # 全局服务实例
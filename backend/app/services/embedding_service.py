@@ -0,0 +1,366 @@
+# backend/app/services/embedding_service.py
+
+import asyncio
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+from uuid import UUID
+import logging
+import numpy as np
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.crud.api_key import api_key_crud
+from app.models.api_key import ApiKey
+from app.llm_clients.base import LLMClient
+from app.llm_clients.factory import LLMClientFactory
+
+logger = logging.getLogger(__name__)
+
+# 各提供商单个 embedding 请求可接受的文本条数上限
+PROVIDER_BATCH_ITEMS = {
+    "openai": 2048,
+    "siliconflow": 64,
+    "nvidia-nim": 128,
+    "bce-qianfan": 16,
+    "ollama": 32,
+}
+
+# 各模型单条输入的 token 上限；超出的文本切分为重叠窗口分别向量化后再合并，未列出的模型不做切分
+MODEL_MAX_INPUT_TOKENS = {
+    "text-embedding-3-small": 8191,
+    "text-embedding-3-large": 8191,
+    "text-embedding-ada-002": 8191,
+    "BAAI/bge-large-zh-v1.5": 512,
+    "BAAI/bge-m3": 8192,
+    "baai/bge-m3": 8192,
+    "netease-youdao/bce-embedding-base_v1": 512,
+    "nvidia/nv-embedqa-e5-v5": 512,
+    "embedding-v1": 384,
+    "bge-large-zh": 512,
+    "tao-8k": 8192,
+    "nomic-embed-text": 8192,
+    "mxbai-embed-large": 512,
+}
+# 切分窗口之间重叠的 token 数，避免语义在窗口边界被截断
+SPLIT_OVERLAP_TOKENS = 64
+# 单条文本的字符数上限（超长文本会切成大量窗口，直接拒绝）
+MAX_TEXT_CHARS = 200_000
+
+
+class EmbeddingServiceError(Exception):
+    """向量化服务专用异常"""
+    def __init__(self, message: str, error_code: str = "EMBEDDING_ERROR"):
+        self.message = message
+        self.error_code = error_code
+        super().__init__(self.message)
+
+# 各提供商支持的 embedding 模型（静态配置）
+PROVIDER_MODELS: Dict[str, Tuple[str, ...]] = {
+    "openai": ("text-embedding-3-small", "text-embedding-3-large", "text-embedding-ada-002"),
+    "siliconflow": ("BAAI/bge-large-zh-v1.5", "BAAI/bge-m3", "netease-youdao/bce-embedding-base_v1"),
+    "nvidia-nim": ("baai/bge-m3", "nvidia/nv-embedqa-e5-v5"),
+    "bce-qianfan": ("embedding-v1", "bge-large-zh", "tao-8k"),
+    "ollama": ("nomic-embed-text", "mxbai-embed-large", "bge-m3"),
+}
+
+
+class UsageBuffer:
+    """
+    API Key 使用统计的进程内缓冲
+
+    每次调用只在内存中累加计数，由后台任务定期合并成一条批量 UPDATE 写入数据库，
+    避免热点 API Key 的每次调用都去竞争同一行的行锁。
+    """
+
+    def __init__(self):
+        self._counts: Dict[UUID, int] = {}
+        self._last_used: Dict[UUID, datetime] = {}
+        self._lock = threading.Lock()
+
+    def record(self, api_key_id: UUID) -> None:
+        """记录一次使用"""
+        with self._lock:
+            self._counts[api_key_id] = self._counts.get(api_key_id, 0) + 1
+            self._last_used[api_key_id] = datetime.now(timezone.utc)
+
+    def flush(self) -> int:
+        """
+        把缓冲的计数写入数据库
+
+        Returns:
+            本次写入的 API Key 数量
+        """
+        with self._lock:
+            counts, self._counts = self._counts, {}
+            last_used, self._last_used = self._last_used, {}
+        if not counts:
+            return 0
+
+        rows = [
+            {"key_id": key_id, "delta": delta, "last_used_at": last_used[key_id]}
+            for key_id, delta in counts.items()
+        ]
+        db = SessionLocal()
+        try:
+            api_key_crud.add_usage_batch(db=db, rows=rows)
+        except Exception as e:
+            db.rollback()
+            # 写入失败时把计数放回缓冲，下次再试
+            with self._lock:
+                for key_id, delta in counts.items():
+                    self._counts[key_id] = self._counts.get(key_id, 0) + delta
+                    self._last_used.setdefault(key_id, last_used[key_id])
+            logger.warning("写入 API Key 使用统计失败，将在下次重试: %s", e)
+            return 0
+        finally:
+            db.close()
+        return len(rows)
+
+    async def run(self, interval: float = 5.0) -> None:
+        """后台定期刷新，直到任务被取消"""
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(self.flush)
+
+
+class EmbeddingService:
+    """
+    向量化服务
+
+    职责：
+    1. 校验 API Key 归属与状态
+    2. 通过 LLM 客户端生成 embedding 向量
+    3. 记录 API Key 使用统计
+
+    同步的数据库查询与密钥解密放到线程池执行；耗时的提供商调用走客户端的异步接口，
+    两者都不占用事件循环。
+    """
+
+    async def create_embeddings(
+        self,
+        *,
+        api_key_id: UUID,
+        user_id: UUID,
+        texts: List[str],
+        model: str,
+        db: Session
+    ) -> np.ndarray:
+        """
+        为文本列表生成 embedding 向量
+
+        Args:
+            api_key_id: 使用的 API Key ID
+            user_id: 用户 ID
+            texts: 需要向量化的文本列表
+            model: 模型名称
+            db: 数据库会话
+
+        Returns:
+            形状为 (len(texts), dim) 的 float32 数组，第 i 行对应 texts[i]；
+            需要 JSON 序列化时在边界处调用 tolist()，向量库 SDK 可直接接收数组
+
+        Raises:
+            EmbeddingServiceError: 参数无效、API Key 不可用或调用提供商失败时
+        """
+        if not texts:
+            raise EmbeddingServiceError("文本列表不能为空", "INVALID_INPUT")
+        if not model or model.isspace():
+            raise EmbeddingServiceError("模型名称不能为空", "INVALID_INPUT")
+        if any(len(text) > MAX_TEXT_CHARS for text in texts):
+            raise EmbeddingServiceError(f"单条文本长度不能超过 {MAX_TEXT_CHARS} 个字符", "TEXT_TOO_LONG")
+
+        # 空白文本没有可向量化的内容，直接拒绝并指出位置，不用占位向量冒充结果
+        blank_indices = [i for i, text in enumerate(texts) if not text or text.isspace()]
+        if blank_indices:
+            shown = ", ".join(str(i) for i in blank_indices[:20])
+            more = f" 等 {len(blank_indices)} 条" if len(blank_indices) > 20 else ""
+            raise EmbeddingServiceError(f"文本不能为空白，位置: {shown}{more}", "INVALID_INPUT")
+
+        # 相同文本只向提供商请求一次，再按原位置展开
+        positions: Dict[str, int] = {}
+        order = [positions.setdefault(text, len(positions)) for text in texts]
+        unique_texts = list(positions)
+
+        api_key_obj, client = await run_in_threadpool(self._load_api_key_and_client, db, api_key_id, user_id)
+
+        try:
+            # 分词与切分是 CPU 密集操作，输入较大时放到线程池，不阻塞事件循环
+            windows = await run_in_threadpool(self._split_windows, client, unique_texts, model)
+
+            # 整体超时后取消任务，在途的子批次请求随之取消，不再占用连接
+            window_embeddings = await asyncio.wait_for(
+                client.acreate_embeddings(
+                    [window for text_windows in windows for window in text_windows],
+                    {
+                        "model": model,
+                        "max_batch_items": PROVIDER_BATCH_ITEMS.get(api_key_obj.provider)
+                    }
+                ),
+                timeout=settings.EMBEDDING_TIMEOUT_SECONDS
+            )
+            unique_embeddings = self._pool_windows(window_embeddings, [len(w) for w in windows])
+        except asyncio.TimeoutError:
+            logger.error("生成嵌入向量超时, API Key: %s", api_key_obj.name)
+            raise EmbeddingServiceError(
+                f"调用 {api_key_obj.provider} 生成嵌入向量超时（{settings.EMBEDDING_TIMEOUT_SECONDS} 秒）",
+                "TIMEOUT"
+            )
+        except Exception as e:
+            logger.error("生成嵌入向量失败, API Key: %s, 错误: %s", api_key_obj.name, e, exc_info=True)
+            raise EmbeddingServiceError(
+                f"调用 {api_key_obj.provider} 生成嵌入向量失败: {str(e)}",
+                "PROVIDER_ERROR"
+            )
+
+        embeddings = unique_embeddings[np.asarray(order)]
+        self._update_usage_stats(api_key_obj)
+        logger.info("成功生成 %d 个文本的嵌入向量, 用户: %s, API Key: %s", len(texts), user_id, api_key_obj.name)
+        return embeddings
+
+    async def validate_api_key(
+        self,
+        *,
+        api_key_id: UUID,
+        user_id: UUID,
+        db: Session
+    ) -> Tuple[bool, str]:
+        """
+        校验 API Key 是否能正常调用提供商（不保存测试结果；短时间内重复校验复用缓存结果）
+
+        Args:
+            api_key_id: API Key ID
+            user_id: 用户 ID
+            db: 数据库会话
+
+        Returns:
+            (是否有效, 验证信息)
+        """
+        api_key_obj, client = await run_in_threadpool(self._load_api_key_and_client, db, api_key_id, user_id)
+        return await run_in_threadpool(
+            LLMClientFactory.validate_cached,
+            api_key_obj.provider,
+            client.api_key,
+            api_key_obj.base_url
+        )
+
+    def get_available_models(
+        self,
+        *,
+        api_key_id: UUID,
+        user_id: UUID,
+        db: Session
+    ) -> List[str]:
+        """
+        获取 API Key 对应提供商可用的 embedding 模型
+
+        Args:
+            api_key_id: API Key ID
+            user_id: 用户 ID
+            db: 数据库会话
+
+        Returns:
+            模型名称列表
+        """
+        api_key_obj = self._get_validated_api_key(db, api_key_id, user_id)
+        return self.get_models_for_provider(api_key_obj.provider)
+
+    def get_models_for_provider(self, provider: str) -> List[str]:
+        """
+        获取提供商支持的 embedding 模型（纯内存查找，不访问数据库）
+
+        Args:
+            provider: 服务提供商
+
+        Returns:
+            模型名称列表
+        """
+        return list(PROVIDER_MODELS.get(provider, ()))
+
+    def _split_windows(self, client: LLMClient, texts: List[str], model: str) -> List[List[str]]:
+        """
+        把超出模型输入上限的文本预先切分为窗口，避免整批请求被提供商以 400 拒绝
+
+        Args:
+            client: LLM 客户端（提供分词与切分）
+            texts: 去重后的文本列表
+            model: 模型名称
+
+        Returns:
+            每个文本的窗口列表；模型没有已知上限时每个文本只有一个窗口
+        """
+        max_input_tokens = MODEL_MAX_INPUT_TOKENS.get(model)
+        if not max_input_tokens:
+            return [[text] for text in texts]
+        return [
+            client.split_text(text, model, max_input_tokens, SPLIT_OVERLAP_TOKENS)
+            for text in texts
+        ]
+
+    def _pool_windows(self, embeddings: np.ndarray, window_counts: List[int]) -> np.ndarray:
+        """
+        把同一文本各窗口的向量取均值并归一化，合并为一个向量
+
+        Args:
+            embeddings: 所有窗口的向量，同一文本的窗口连续排列
+            window_counts: 每个文本的窗口数
+
+        Returns:
+            每个文本一行的向量数组；只有一个窗口的文本原样保留
+        """
+        counts = np.asarray(window_counts)
+        if (counts == 1).all():
+            return embeddings
+
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        pooled = np.add.reduceat(embeddings, starts, axis=0) / counts[:, None]
+        split = counts > 1
+        pooled[split] /= np.linalg.norm(pooled[split], axis=1, keepdims=True)
+        return pooled.astype(np.float32, copy=False)
+
+    def _get_validated_api_key(self, db: Session, api_key_id: UUID, user_id: UUID) -> ApiKey:
+        """
+        获取属于该用户且处于启用状态的 API Key
+
+        Raises:
+            EmbeddingServiceError: API Key 不存在或已被禁用时
+        """
+        api_key_obj = api_key_crud.get(db=db, id=api_key_id, user_id=user_id)
+        if not api_key_obj:
+            raise EmbeddingServiceError(
+                f"API Key 不存在或您无权访问: {api_key_id}",
+                "NOT_FOUND"
+            )
+        if not api_key_obj.is_active():
+            raise EmbeddingServiceError(
+                f"API Key 已被禁用: {api_key_obj.name}",
+                "INACTIVE"
+            )
+        return api_key_obj
+
+    def _load_api_key_and_client(self, db: Session, api_key_id: UUID, user_id: UUID) -> Tuple[ApiKey, LLMClient]:
+        """查询并校验 API Key，再创建客户端（同步查询与解密，由调用方放到线程池执行）"""
+        api_key_obj = self._get_validated_api_key(db, api_key_id, user_id)
+        return api_key_obj, self._get_llm_client(api_key_obj)
+
+    def _get_llm_client(self, api_key_obj: ApiKey) -> LLMClient:
+        """解密 API Key 并创建对应提供商的客户端"""
+        plaintext_key = api_key_crud.get_plaintext_key(
+            encrypted_key=api_key_obj.encrypted_api_key
+        )
+        return LLMClientFactory.get_client(
+            provider=api_key_obj.provider,
+            api_key=plaintext_key,
+            base_url=api_key_obj.base_url
+        )
+
+    def _update_usage_stats(self, api_key_obj: ApiKey) -> None:
+        """记录一次使用（写入内存缓冲，由后台任务批量落库）"""
+        usage_buffer.record(api_key_obj.id)
+
+
+# 全局实例
+usage_buffer = UsageBuffer()
+embedding_service = EmbeddingService()
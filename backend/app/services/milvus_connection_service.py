@@ -1,17 +1,174 @@
 # backend/app/services/milvus_connection_service.py
 
-from typing import List, Dict, Any, Optional, Tuple
+import atexit
+from datetime import datetime, timezone
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import functools
+from functools import lru_cache
+from typing import List, Dict, Any, Literal, Optional, Tuple
 from uuid import UUID
+import hashlib
 import logging
+import re
 import threading
-from sqlalchemy.orm import Session
+import time
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from starlette.concurrency import run_in_threadpool
 
+from app.core.config import settings
+from app.core.crypto import decrypt_sensitive_data
+from app.core.db import SessionLocal
 from app.crud.milvus_connection import milvus_connection_crud
 from app.models.milvus_connection import MilvusConnection
 from app.schemas.milvus_connection import MilvusConnectionCreate, MilvusConnectionUpdate
 
+try:
+    from pymilvus import MilvusClient
+except ImportError:
+    MilvusClient = None
+
 logger = logging.getLogger(__name__)
 
+# 后台连接测试线程池：限制并发线程数（也就限制了后台任务占用的数据库连接数）
+_test_executor = ThreadPoolExecutor(
+    max_workers=settings.MILVUS_TEST_WORKERS,
+    thread_name_prefix="milvus-test"
+)
+atexit.register(_test_executor.shutdown, wait=False)
+
+# Milvus 错误信息中的关键词，用于把异常归类为用户可读的提示
+_ERROR_KEYWORDS_RE = re.compile(
+    r"(?P<permission>permission|unauthorized)"
+    r"|(?P<database>database)"
+    r"|(?P<not_found>not found)"
+    r"|(?P<refused>connection refused|failed to connect)"
+    r"|(?P<auth>authentication|credential)"
+    r"|(?P<timeout>timeout)",
+    re.IGNORECASE
+)
+
+# MilvusClient 缓存：复用已建立的 gRPC 通道，验证连接时只需轻量的探活调用，
+# 不必每次重新握手和认证。按 LRU 淘汰，空闲超时的客户端在下次访问缓存时移出。
+# 客户端可能同时被多个线程使用，移出缓存时若仍有线程持有，由最后一个归还的线程关闭
+_CLIENT_CACHE_SIZE = 32
+_CLIENT_IDLE_SECONDS = 600
+_client_cache: "OrderedDict[tuple, _CachedClient]" = OrderedDict()
+_client_lock = threading.Lock()
+
+
+class _CachedClient:
+    """缓存中的客户端及其使用状态（字段均在 _client_lock 下读写）"""
+    __slots__ = ("key", "client", "last_used", "users", "evicted")
+
+    def __init__(self, key: tuple, client: Any, last_used: float):
+        self.key = key
+        self.client = client
+        self.last_used = last_used
+        self.users = 0
+        self.evicted = False
+
+
+def _client_cache_key(uri: str, database_name: Optional[str], token: Optional[str], timeout_seconds: int) -> tuple:
+    """缓存键中只保存 token 摘要"""
+    token_hash = hashlib.blake2b(token.encode(), digest_size=16).hexdigest() if token else None
+    return (uri, database_name or "", token_hash, timeout_seconds)
+
+
+def _close_clients(clients: List[Any]) -> None:
+    for client in clients:
+        try:
+            client.close()
+        except Exception as close_error:
+            logger.warning("关闭 Milvus 客户端时发生警告: %s", close_error)
+
+
+def _retire(entry: _CachedClient) -> List[Any]:
+    """标记条目已移出缓存；无线程持有时返回需要关闭的客户端（需在 _client_lock 下调用）"""
+    entry.evicted = True
+    return [entry.client] if entry.users == 0 else []
+
+
+def _checkout_milvus_client(key: tuple, factory) -> _CachedClient:
+    """
+    借出缓存的 MilvusClient，不存在时用 factory 创建；用完后必须调用 _checkin_milvus_client 归还
+
+    Args:
+        key: _client_cache_key 生成的缓存键
+        factory: 无参函数，返回新的 MilvusClient
+
+    Returns:
+        缓存条目（entry.client 为 MilvusClient 实例）
+    """
+    now = time.monotonic()
+    to_close = []
+    with _client_lock:
+        for cache_key, cached in list(_client_cache.items()):
+            if now - cached.last_used > _CLIENT_IDLE_SECONDS:
+                del _client_cache[cache_key]
+                to_close.extend(_retire(cached))
+        entry = _client_cache.get(key)
+        if entry is not None:
+            entry.last_used = now
+            entry.users += 1
+            _client_cache.move_to_end(key)
+    _close_clients(to_close)
+    if entry is not None:
+        return entry
+
+    # 握手在锁外进行，避免一个慢连接阻塞其他连接的验证
+    client = factory()
+    to_close = []
+    with _client_lock:
+        entry = _client_cache.get(key)
+        if entry is not None:
+            # 并发创建时保留先放入的实例，新建的尚未被其他线程使用，可直接关闭
+            to_close.append(client)
+        else:
+            entry = _client_cache[key] = _CachedClient(key, client, now)
+        entry.last_used = now
+        entry.users += 1
+        _client_cache.move_to_end(key)
+        while len(_client_cache) > _CLIENT_CACHE_SIZE:
+            to_close.extend(_retire(_client_cache.popitem(last=False)[1]))
+    _close_clients(to_close)
+    return entry
+
+
+def _checkin_milvus_client(entry: _CachedClient, evict: bool = False) -> None:
+    """
+    归还借出的客户端
+
+    Args:
+        entry: _checkout_milvus_client 返回的条目
+        evict: 是否移出缓存（连接或认证失败时），仍有其他线程持有时由最后归还者关闭
+    """
+    with _client_lock:
+        entry.users -= 1
+        if evict and not entry.evicted:
+            del _client_cache[entry.key]
+            entry.evicted = True
+        to_close = [entry.client] if entry.evicted and entry.users == 0 else []
+    _close_clients(to_close)
+
+
+@lru_cache(maxsize=2048)
+def _token_display(encrypted_token: str) -> str:
+    """
+    由密文计算 token 的脱敏显示（仅用于尚无 token_preview 的旧数据，按密文缓存，每个 token 只解密一次）
+    
+    Args:
+        encrypted_token: 数据库中的加密 token
+        
+    Returns:
+        脱敏后的 token 信息字符串
+        
+    Raises:
+        Exception: 解密失败时（异常不会被缓存，下次调用会重新尝试）
+    """
+    return MilvusConnection.generate_token_preview(decrypt_sensitive_data(encrypted_token))
+
 
 class MilvusConnectionServiceError(Exception):
     """Milvus 连接服务专用异常"""
@@ -21,6 +178,29 @@ class MilvusConnectionServiceError(Exception):
         super().__init__(self.message)
 
 
+def _service_errors(action: str, error_code: str):
+    """
+    服务方法的统一错误转换：业务异常原样抛出，其余异常记录日志后
+    包装为 MilvusConnectionServiceError
+    
+    Args:
+        action: 操作描述，用于日志和错误信息，如 "创建连接配置"
+        error_code: 包装后的错误码
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            except MilvusConnectionServiceError:
+                raise
+            except Exception as e:
+                logger.error("%s失败: %s", action, e, exc_info=True)
+                raise MilvusConnectionServiceError(f"{action}失败: {str(e)}", error_code)
+        return wrapper
+    return decorator
+
+
 class MilvusConnectionService:
     """
     Milvus 连接配置管理服务
@@ -36,6 +216,7 @@ class MilvusConnectionService:
     - 实用主义：解决实际问题
     """
     
+    @_service_errors("创建连接配置", "CREATE_ERROR")
     def create_connection(
         self,
         *,
@@ -57,38 +238,29 @@ class MilvusConnectionService:
         Raises:
             MilvusConnectionServiceError: 创建失败时
         """
-        try:
-            # 检查名称是否重复
-            existing_connection = milvus_connection_crud.get_by_name(
-                db=db, name=connection_data.name, user_id=user_id
-            )
-            if existing_connection:
-                raise MilvusConnectionServiceError(
-                    f"连接配置名称 '{connection_data.name}' 已存在",
-                    "DUPLICATE_NAME"
-                )
-            
-            # 创建连接配置
-            connection_obj = milvus_connection_crud.create(
-                db=db, obj_in=connection_data, user_id=user_id
-            )
-            
-            # 异步测试新创建的连接配置（不阻塞响应）
-            logger.info(f"启动异步测试 - Milvus 连接: {connection_obj.name}")
-            self.async_test_connection(connection_obj.id, user_id)
-            
-            # 返回安全信息
-            return self._format_connection_response(connection_obj)
-            
-        except MilvusConnectionServiceError:
-            raise
-        except Exception as e:
-            logger.error(f"创建 Milvus 连接配置失败: {e}", exc_info=True)
+        # 检查名称是否重复
+        existing_connection = milvus_connection_crud.get_by_name(
+            db=db, name=connection_data.name, user_id=user_id
+        )
+        if existing_connection:
             raise MilvusConnectionServiceError(
-                f"创建连接配置失败: {str(e)}",
-                "CREATE_ERROR"
+                f"连接配置名称 '{connection_data.name}' 已存在",
+                "DUPLICATE_NAME"
             )
+        
+        # 创建连接配置
+        connection_obj = milvus_connection_crud.create(
+            db=db, obj_in=connection_data, user_id=user_id
+        )
+        
+        # 异步测试新创建的连接配置（不阻塞响应）
+        logger.info("启动异步测试 - Milvus 连接: %s", connection_obj.name)
+        self.async_test_connection(connection_obj.id, user_id, connection_obj=connection_obj)
+        
+        # 返回安全信息
+        return self._format_connection_response(connection_obj)
     
+    @_service_errors("获取连接配置列表", "GET_LIST_ERROR")
     def get_user_connections(
         self,
         *,
@@ -111,29 +283,22 @@ class MilvusConnectionService:
         Returns:
             包含连接配置列表和总数的字典
         """
-        try:
-            connections, total = milvus_connection_crud.get_multi(
-                db=db,
-                user_id=user_id,
-                status=status,
-                skip=skip,
-                limit=limit
-            )
-            
-            return {
-                "items": [self._format_connection_response(conn) for conn in connections],
-                "total": total,
-                "skip": skip,
-                "limit": limit
-            }
-            
-        except Exception as e:
-            logger.error(f"获取用户 Milvus 连接配置列表失败: {e}", exc_info=True)
-            raise MilvusConnectionServiceError(
-                f"获取连接配置列表失败: {str(e)}",
-                "GET_LIST_ERROR"
-            )
+        connections, total = milvus_connection_crud.get_multi(
+            db=db,
+            user_id=user_id,
+            status=status,
+            skip=skip,
+            limit=limit
+        )
+        
+        return {
+            "items": [self._format_connection_response(conn) for conn in connections],
+            "total": total,
+            "skip": skip,
+            "limit": limit
+        }
     
+    @_service_errors("获取连接配置", "GET_ERROR")
     def get_connection(
         self,
         *,
@@ -152,25 +317,16 @@ class MilvusConnectionService:
         Returns:
             连接配置信息
         """
-        try:
-            connection_obj = milvus_connection_crud.get(db=db, id=connection_id, user_id=user_id)
-            if not connection_obj:
-                raise MilvusConnectionServiceError(
-                    f"连接配置不存在或您无权访问: {connection_id}",
-                    "NOT_FOUND"
-                )
-            
-            return self._format_connection_response(connection_obj)
-            
-        except MilvusConnectionServiceError:
-            raise
-        except Exception as e:
-            logger.error(f"获取 Milvus 连接配置失败: {e}", exc_info=True)
+        connection_obj = milvus_connection_crud.get(db=db, id=connection_id, user_id=user_id)
+        if not connection_obj:
             raise MilvusConnectionServiceError(
-                f"获取连接配置失败: {str(e)}",
-                "GET_ERROR"
+                f"连接配置不存在或您无权访问: {connection_id}",
+                "NOT_FOUND"
             )
+        
+        return self._format_connection_response(connection_obj)
     
+    @_service_errors("更新连接配置", "UPDATE_ERROR")
     def update_connection(
         self,
         *,
@@ -191,42 +347,33 @@ class MilvusConnectionService:
         Returns:
             更新后的连接配置信息
         """
-        try:
-            # 获取现有连接配置
-            connection_obj = milvus_connection_crud.get(db=db, id=connection_id, user_id=user_id)
-            if not connection_obj:
-                raise MilvusConnectionServiceError(
-                    f"连接配置不存在或您无权访问: {connection_id}",
-                    "NOT_FOUND"
-                )
-            
-            # 检查名称重复（如果要更新名称）
-            if update_data.name and update_data.name != connection_obj.name:
-                existing_connection = milvus_connection_crud.get_by_name(
-                    db=db, name=update_data.name, user_id=user_id
-                )
-                if existing_connection:
-                    raise MilvusConnectionServiceError(
-                        f"连接配置名称 '{update_data.name}' 已存在",
-                        "DUPLICATE_NAME"
-                    )
-            
-            # 更新连接配置
-            updated_connection = milvus_connection_crud.update(
-                db=db, db_obj=connection_obj, obj_in=update_data
-            )
-            
-            return self._format_connection_response(updated_connection)
-            
-        except MilvusConnectionServiceError:
-            raise
-        except Exception as e:
-            logger.error(f"更新 Milvus 连接配置失败: {e}", exc_info=True)
+        # 获取现有连接配置
+        connection_obj = milvus_connection_crud.get(db=db, id=connection_id, user_id=user_id)
+        if not connection_obj:
             raise MilvusConnectionServiceError(
-                f"更新连接配置失败: {str(e)}",
-                "UPDATE_ERROR"
+                f"连接配置不存在或您无权访问: {connection_id}",
+                "NOT_FOUND"
+            )
+        
+        # 检查名称重复（如果要更新名称）
+        if update_data.name and update_data.name != connection_obj.name:
+            existing_connection = milvus_connection_crud.get_by_name(
+                db=db, name=update_data.name, user_id=user_id
             )
+            if existing_connection:
+                raise MilvusConnectionServiceError(
+                    f"连接配置名称 '{update_data.name}' 已存在",
+                    "DUPLICATE_NAME"
+                )
+        
+        # 更新连接配置
+        updated_connection = milvus_connection_crud.update(
+            db=db, db_obj=connection_obj, obj_in=update_data
+        )
+        
+        return self._format_connection_response(updated_connection)
     
+    @_service_errors("删除连接配置", "DELETE_ERROR")
     def delete_connection(
         self,
         *,
@@ -245,25 +392,15 @@ class MilvusConnectionService:
         Returns:
             是否删除成功
         """
-        try:
-            success = milvus_connection_crud.delete(db=db, id=connection_id, user_id=user_id)
-            if not success:
-                raise MilvusConnectionServiceError(
-                    f"连接配置不存在或您无权删除: {connection_id}",
-                    "NOT_FOUND"
-                )
-            
-            logger.info(f"成功删除 Milvus 连接配置: {connection_id}")
-            return True
-            
-        except MilvusConnectionServiceError:
-            raise
-        except Exception as e:
-            logger.error(f"删除 Milvus 连接配置失败: {e}", exc_info=True)
+        success = milvus_connection_crud.delete(db=db, id=connection_id, user_id=user_id)
+        if not success:
             raise MilvusConnectionServiceError(
-                f"删除连接配置失败: {str(e)}",
-                "DELETE_ERROR"
+                f"连接配置不存在或您无权删除: {connection_id}",
+                "NOT_FOUND"
             )
+        
+        logger.info("成功删除 Milvus 连接配置: %s", connection_id)
+        return True
     
     def validate_connection(
         self,
@@ -272,7 +409,10 @@ class MilvusConnectionService:
         user_id: UUID,
         db: Session,
         timeout_seconds: int = 10,
-        save_result: bool = True
+        save_result: bool = True,
+        probe_mode: Literal["health", "full"] = "full",
+        connection_obj: Optional[MilvusConnection] = None,
+        ttl_seconds: int = 0
     ) -> Tuple[bool, str, float | None, Optional[str], Optional[int]]:
         """
         验证 Milvus 连接配置是否有效
@@ -283,21 +423,29 @@ class MilvusConnectionService:
             db: 数据库会话
             timeout_seconds: 连接超时时间
             save_result: 是否保存测试结果到数据库
+            probe_mode: "health" 只做轻量探活；"full" 额外获取集合数量
+            connection_obj: 调用方已持有的连接对象（须属于 db 会话）；ID 与用户都匹配时不再按 ID 查询
+            ttl_seconds: 上次测试成功且距今不超过该秒数时直接返回上次结果，不连接 Milvus 也不写库；0 表示总是重新测试
             
         Returns:
             (是否有效, 验证信息, 响应时间ms, 服务器版本, 集合数量)
         """
-        import time
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         try:
-            # 获取连接配置
-            connection_obj = milvus_connection_crud.get(db=db, id=connection_id, user_id=user_id)
+            # 获取连接配置（调用方已持有且 ID 与归属一致的对象直接复用，否则按 ID 查询）
+            if connection_obj is not None and (
+                connection_obj.id != connection_id or connection_obj.user_id != user_id
+            ):
+                logger.warning("传入的 Milvus 连接对象与连接 ID 或用户不匹配，改为按 ID 查询: %s", connection_id)
+                connection_obj = None
+            if connection_obj is None:
+                connection_obj = milvus_connection_crud.get(db=db, id=connection_id, user_id=user_id)
             if not connection_obj:
                 return False, "连接配置不存在或您无权访问", None, None, None
             
             if not connection_obj.is_active():
-                response_time = (time.time() - start_time) * 1000
+                response_time = (time.perf_counter_ns() - start_ns) / 1_000_000
                 if save_result:
                     milvus_connection_crud.update_test_result(
                         db=db, db_obj=connection_obj, 
@@ -305,6 +453,15 @@ class MilvusConnectionService:
                     )
                 return False, "连接配置已被禁用", response_time, None, None
             
+            # 最近一次测试成功且仍在有效期内：复用上次结果
+            if (
+                ttl_seconds > 0
+                and connection_obj.test_status == "success"
+                and connection_obj.last_tested_at is not None
+                and (datetime.now(timezone.utc) - connection_obj.last_tested_at).total_seconds() < ttl_seconds
+            ):
+                return True, connection_obj.test_message, connection_obj.test_response_time, None, None
+            
             # 获取明文认证 token
             token = milvus_connection_crud.get_plaintext_token(
                 connection=connection_obj
@@ -315,10 +472,11 @@ class MilvusConnectionService:
                 uri=connection_obj.uri,
                 database_name=connection_obj.database_name,
                 token=token,
-                timeout_seconds=timeout_seconds
+                timeout_seconds=timeout_seconds,
+                probe_mode=probe_mode
             )
             
-            response_time = (time.time() - start_time) * 1000
+            response_time = (time.perf_counter_ns() - start_ns) / 1_000_000
             
             # 保存测试结果
             if save_result:
@@ -329,66 +487,119 @@ class MilvusConnectionService:
                 )
             
             if is_valid:
-                logger.info(f"Milvus 连接验证成功: {connection_obj.name}")
+                logger.info("Milvus 连接验证成功: %s", connection_obj.name)
             else:
-                logger.warning(f"Milvus 连接验证失败: {connection_obj.name}, 原因: {message}")
+                logger.warning("Milvus 连接验证失败: %s, 原因: %s", connection_obj.name, message)
             
             return is_valid, message, response_time, server_version, collections_count
             
         except Exception as e:
-            response_time = (time.time() - start_time) * 1000
+            response_time = (time.perf_counter_ns() - start_ns) / 1_000_000
             error_message = f"验证过程中发生错误: {str(e)}"
             
-            # 保存错误结果
-            if save_result:
+            # 保存错误结果（复用已查询到的连接对象，不再重复查询）
+            if save_result and connection_obj is not None:
                 try:
-                    connection_obj = milvus_connection_crud.get(db=db, id=connection_id, user_id=user_id)
-                    if connection_obj:
-                        milvus_connection_crud.update_test_result(
-                            db=db, db_obj=connection_obj,
-                            success=False, message=error_message, response_time=response_time
-                        )
-                except:
-                    pass  # 避免在保存错误时再次出错
+                    db.rollback()
+                    milvus_connection_crud.update_test_result(
+                        db=db, db_obj=connection_obj,
+                        success=False, message=error_message, response_time=response_time
+                    )
+                except Exception as save_error:
+                    # 避免在保存错误时再次出错
+                    logger.warning("保存 Milvus 连接测试结果失败: %s", save_error)
             
-            logger.error(f"Milvus 连接验证过程中发生错误: {e}", exc_info=True)
+            logger.error("Milvus 连接验证过程中发生错误: %s", e, exc_info=True)
             return False, error_message, response_time, None, None
     
-    def async_test_connection(self, connection_id: UUID, user_id: UUID) -> None:
+    async def avalidate_connection(
+        self,
+        *,
+        connection_id: UUID,
+        user_id: UUID,
+        db: Session,
+        timeout_seconds: int = 10,
+        save_result: bool = True,
+        probe_mode: Literal["health", "full"] = "full",
+        ttl_seconds: int = 0
+    ) -> Tuple[bool, str, float | None, Optional[str], Optional[int]]:
+        """
+        validate_connection 的异步版本，供 async 路由调用
+        
+        探测在 Starlette 管理的线程池中执行（与同步路由共用有界的 anyio 限流器），
+        等待 Milvus 响应期间不阻塞事件循环；仍使用同步 MilvusClient，以便与后台探测共用客户端缓存
+        
+        Args:
+            与 validate_connection 相同
+            
+        Returns:
+            (是否有效, 验证信息, 响应时间ms, 服务器版本, 集合数量)
+        """
+        return await run_in_threadpool(
+            self.validate_connection,
+            connection_id=connection_id,
+            user_id=user_id,
+            db=db,
+            timeout_seconds=timeout_seconds,
+            save_result=save_result,
+            probe_mode=probe_mode,
+            ttl_seconds=ttl_seconds
+        )
+    
+    def async_test_connection(
+        self,
+        connection_id: UUID,
+        user_id: UUID,
+        connection_obj: Optional[MilvusConnection] = None
+    ) -> None:
         """
         异步测试 Milvus 连接配置（后台任务）
         
         Args:
             connection_id: 连接配置 ID
             user_id: 用户 ID
+            connection_obj: 调用方刚创建/查询到的连接对象，传入时后台不再重复查询
         """
+        # 只在对象确属该连接和用户时复用；在请求线程中复制列值，后台线程不再访问请求会话中的原对象
+        snapshot = None
+        if connection_obj is not None and connection_obj.id == connection_id and connection_obj.user_id == user_id:
+            snapshot = {
+                attr.key: getattr(connection_obj, attr.key)
+                for attr in sa_inspect(MilvusConnection).column_attrs
+            }
+        
         def test_in_background():
+            # 数据库会话在后台线程中创建和关闭
+            db = SessionLocal()
             try:
-                # 创建新的数据库会话用于后台任务
-                from app.core.db import SessionLocal
-                db = SessionLocal()
+                background_obj = None
+                if snapshot is not None:
+                    # 由复制的列值重建已持久化对象并并入后台会话（load=False 不发 SELECT）
+                    background_obj = MilvusConnection(**snapshot)
+                    make_transient_to_detached(background_obj)
+                    background_obj = db.merge(background_obj, load=False)
+                
+                # 执行测试（保存结果到数据库）
+                is_valid, message, response_time, server_version, collections_count = self.validate_connection(
+                    connection_id=connection_id,
+                    user_id=user_id,
+                    db=db,
+                    save_result=True,
+                    probe_mode="health",  # 创建后的自动探测只需确认可连通
+                    connection_obj=background_obj
+                )
+                
+                logger.info("异步测试完成 - Milvus 连接: %s, 结果: %s", connection_id, "成功" if is_valid else "失败")
                 
-                try:
-                    # 执行测试（保存结果到数据库）
-                    is_valid, message, response_time, server_version, collections_count = self.validate_connection(
-                        connection_id=connection_id,
-                        user_id=user_id,
-                        db=db,
-                        save_result=True
-                    )
-                    
-                    logger.info(f"异步测试完成 - Milvus 连接: {connection_id}, 结果: {'成功' if is_valid else '失败'}")
-                    
-                finally:
-                    db.close()
-                    
             except Exception as e:
-                logger.error(f"异步测试 Milvus 连接失败: {e}", exc_info=True)
+                logger.error("异步测试 Milvus 连接失败: %s", e, exc_info=True)
+            finally:
+                db.close()
         
-        # 在后台线程中执行测试
-        thread = threading.Thread(target=test_in_background, daemon=True)
-        thread.start()
+        # 提交到后台线程池执行测试
+        _test_executor.submit(test_in_background)
     
+    @_service_errors("获取统计信息", "STATS_ERROR")
     def get_user_stats(
         self,
         *,
@@ -405,16 +616,8 @@ class MilvusConnectionService:
         Returns:
             统计信息字典
         """
-        try:
-            stats = milvus_connection_crud.get_user_stats(db=db, user_id=user_id)
-            return stats
-            
-        except Exception as e:
-            logger.error(f"获取用户统计信息失败: {e}", exc_info=True)
-            raise MilvusConnectionServiceError(
-                f"获取统计信息失败: {str(e)}",
-                "STATS_ERROR"
-            )
+        stats = milvus_connection_crud.get_user_stats(db=db, user_id=user_id)
+        return stats
     
     def _get_token_display_info(self, connection_obj: MilvusConnection) -> str:
         """
@@ -428,26 +631,10 @@ class MilvusConnectionService:
         """
         if not connection_obj.encrypted_token:
             return "未配置"
-        
+        if connection_obj.token_preview:
+            return connection_obj.token_preview
         try:
-            from app.core.crypto import decrypt_sensitive_data
-            token = decrypt_sensitive_data(connection_obj.encrypted_token)
-            
-            # 如果是 username:password 格式，只显示用户名
-            if ':' in token:
-                username, _ = token.split(':', 1)
-                # 如果用户名过长，也进行截断
-                if len(username) > 20:
-                    return f"{username[:15]}...***"
-                return f"{username}:***"
-            else:
-                # 纯 token，显示首尾部分
-                if len(token) <= 8:
-                    return "***token***"
-                elif len(token) <= 16:
-                    return f"{token[:3]}***{token[-3:]}"
-                else:
-                    return f"{token[:6]}***{token[-4:]}"
+            return _token_display(connection_obj.encrypted_token)
         except Exception:
             return "认证配置异常"
     
@@ -478,9 +665,7 @@ class MilvusConnectionService:
             "test_message": connection_obj.test_message,
             "test_response_time": connection_obj.test_response_time,
             "created_at": connection_obj.created_at,
-            "updated_at": connection_obj.updated_at,
-            # 生成连接字符串用于显示
-            "connection_string": connection_obj.get_connection_string()
+            "updated_at": connection_obj.updated_at
         }
     
     def _test_milvus_connection(
@@ -489,7 +674,8 @@ class MilvusConnectionService:
         uri: str,
         database_name: Optional[str] = None,
         token: Optional[str] = None,
-        timeout_seconds: int = 10
+        timeout_seconds: int = 10,
+        probe_mode: Literal["health", "full"] = "health"
     ) -> Tuple[bool, str, Optional[str], Optional[int]]:
         """
         测试 Milvus 连接
@@ -499,13 +685,16 @@ class MilvusConnectionService:
             database_name: 数据库名称
             token: 认证 token（可以是 username:password 或纯 token）
             timeout_seconds: 超时时间
+            probe_mode: "health" 仅调用 get_server_version 探活；
+                "full" 额外调用 list_collections 统计集合数量（集合多时响应体较大）
             
         Returns:
             (是否成功, 消息, 服务器版本, 集合数量)
         """
+        if MilvusClient is None:
+            return False, "PyMilvus 库未安装: 无法测试 Milvus 连接", None, None
+        
         try:
-            from pymilvus import MilvusClient
-            
             # 构建连接参数 - 直接使用 URI
             connect_params = {
                 "uri": uri,
@@ -519,10 +708,13 @@ class MilvusConnectionService:
             if database_name:
                 connect_params["db_name"] = database_name
             
-            # 使用 MilvusClient 建立连接 - 确保资源正确释放
-            client = None
+            # 复用缓存的 MilvusClient；连接或认证失败时移出缓存，下次重新建立连接
+            cache_key = _client_cache_key(uri, database_name, token, timeout_seconds)
+            entry = None
+            evict = False
             try:
-                client = MilvusClient(**connect_params)
+                entry = _checkout_milvus_client(cache_key, lambda: MilvusClient(**connect_params))
+                client = entry.client
                 
                 # 测试连接和数据库
                 server_version = None
@@ -543,11 +735,15 @@ class MilvusConnectionService:
                 else:
                     database_validated = True  # default 数据库或未指定数据库
                 
-                # 2. 测试连接 - 尝试获取集合列表
-                collections_list = client.list_collections()
-                collections_count = len(collections_list) if collections_list else 0
+                # 2. 测试连接 - 获取服务器版本（单次轻量 RPC）
+                server_version = client.get_server_version()
+                
+                # 3. 完整模式下再获取集合列表
+                if probe_mode == "full":
+                    collections_list = client.list_collections()
+                    collections_count = len(collections_list) if collections_list else 0
                 
-                # 3. 构建成功消息
+                # 4. 构建成功消息
                 success_msg = "连接成功"
                 if database_validated and database_name:
                     success_msg += f"，数据库 '{database_name}' 验证通过"
@@ -557,34 +753,27 @@ class MilvusConnectionService:
                 return True, success_msg, server_version, collections_count
                     
             except Exception as e:
-                # 处理连接和测试异常
-                error_str = str(e).lower()
-                if "permission" in error_str or "unauthorized" in error_str:
+                # 处理连接和测试异常：一次扫描找出所有关键词，再按优先级分类
+                error_msg = str(e)
+                kinds = {match.lastgroup for match in _ERROR_KEYWORDS_RE.finditer(error_msg)}
+                # 只有连接或认证失败才说明通道不可用；权限受限等错误下通道仍可复用
+                evict = bool(kinds & {"refused", "auth", "timeout"})
+                if "permission" in kinds:
                     return True, "连接成功（但可能权限受限，无法获取详细信息）", None, 0
-                elif "database" in error_str and "not found" in error_str:
+                elif "database" in kinds and "not_found" in kinds:
                     return False, f"数据库 '{database_name}' 不存在", None, None
-                
-                error_msg = str(e)
-                if "connection refused" in error_msg.lower() or "failed to connect" in error_msg.lower():
+                elif "refused" in kinds:
                     return False, f"连接被拒绝: 请检查连接地址 {uri} 是否正确", None, None
-                elif "authentication" in error_msg.lower() or "credential" in error_msg.lower() or "unauthorized" in error_msg.lower():
+                elif "auth" in kinds:
                     return False, "认证失败: 请检查认证 token 是否正确", None, None
-                elif "timeout" in error_msg.lower():
+                elif "timeout" in kinds:
                     return False, f"连接超时: 服务器响应时间超过 {timeout_seconds} 秒", None, None
                 else:
                     return False, f"连接失败: {error_msg}", None, None
-                    
             finally:
-                # 关键修复：确保客户端连接被正确关闭，防止资源泄漏
-                if client is not None:
-                    try:
-                        client.close()
-                    except Exception as close_error:
-                        # 关闭失败不应该影响主要逻辑，但需要记录警告
-                        logger.warning(f"关闭 Milvus 客户端时发生警告: {close_error}")
+                if entry is not None:
+                    _checkin_milvus_client(entry, evict=evict)
                 
-        except ImportError:
-            return False, "PyMilvus 库未安装: 无法测试 Milvus 连接", None, None
         except Exception as e:
             return False, f"测试过程中发生未知错误: {str(e)}", None, None
 
@@ -1,4 +1,6 @@
+import asyncio
 import sys
+import contextlib
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -7,6 +9,7 @@ from fastapi.responses import HTMLResponse
 from app.api.v1.router import api_router
 from app.core.config import settings
 from app.core.crypto import initialize_crypto
+from app.services.embedding_service import usage_buffer
 
 # 启动前检查所有必要的加密密钥
 try:
@@ -20,8 +23,14 @@ except ValueError as e:
 async def lifespan(app: FastAPI):
     # 启动时初始化加密系统
     initialize_crypto()
+    # 后台定期把 API Key 使用统计批量写入数据库
+    usage_flush_task = asyncio.create_task(usage_buffer.run())
     yield
-    # 关闭时的清理（如果需要）
+    # 关闭时等后台任务真正停止，再在线程池中写入剩余的使用统计，不阻塞事件循环
+    usage_flush_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await usage_flush_task
+    await asyncio.to_thread(usage_buffer.flush)
 
 # 创建 FastAPI 应用实例
 app = FastAPI(
@@ -48,10 +57,8 @@ app.include_router(api_router, prefix="/api/v1")
 
 
 
-@app.get("/docs", response_class=HTMLResponse)
-async def custom_swagger_ui_html():
-    """自定义 Swagger UI，使用国内可访问的 CDN"""
-    return HTMLResponse(content="""
+# 自定义 Swagger UI 页面是常量：导入时编码一次，每次请求直接返回字节，并允许浏览器缓存
+_SWAGGER_UI_HTML = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -79,7 +86,14 @@ async def custom_swagger_ui_html():
         </script>
     </body>
     </html>
-    """, status_code=200)
+""".encode("utf-8")
+_SWAGGER_UI_HEADERS = {"Cache-Control": "public, max-age=3600"}
+
+
+@app.get("/docs", response_class=HTMLResponse)
+async def custom_swagger_ui_html():
+    """自定义 Swagger UI，使用国内可访问的 CDN"""
+    return HTMLResponse(content=_SWAGGER_UI_HTML, headers=_SWAGGER_UI_HEADERS)
 
 
 @app.get("/")
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+测试 EmbeddingService 与 /embeddings 接口
+
+不连接数据库和真实提供商：API Key 查询与 LLM 客户端用内存中的替身代替
+"""
+
+import asyncio
+import threading
+import uuid
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints.embeddings.router import router as embeddings_router
+from app.core.db import get_db
+from app.core.security import get_current_active_user
+from app.llm_clients.base import LLMClient, Embeddings
+from app.models.api_key import ApiKey
+from app.services import embedding_service as embedding_module
+from app.services.embedding_service import EmbeddingService, EmbeddingServiceError
+
+USER_ID = uuid.uuid4()
+KEY_ID = uuid.uuid4()
+DIM = 4
+
+
+class FakeClient(LLMClient):
+    """按文本内容生成确定性向量的客户端，并记录每次请求发送的文本"""
+
+    def __init__(self, delay: float = 0.0):
+        super().__init__(api_key="sk-test", base_url=None)
+        self.delay = delay
+        self.calls: List[List[str]] = []
+
+    @staticmethod
+    def vector(text: str) -> List[float]:
+        seed = sum(text.encode()) % 97 + 1
+        return [float(seed), float(len(text)), 1.0, 0.0]
+
+    def create_embeddings(self, texts: List[str], options: Dict[str, Any]) -> Embeddings:
+        self.calls.append(list(texts))
+        return self._to_array([self.vector(text) for text in texts])
+
+    async def acreate_embeddings(self, texts: List[str], options: Dict[str, Any]) -> Embeddings:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.create_embeddings(texts, options)
+
+    def validate_api_key(self) -> Tuple[bool, str]:
+        return True, "ok"
+
+
+def make_api_key(status: str = "active") -> ApiKey:
+    return ApiKey(
+        id=KEY_ID,
+        user_id=USER_ID,
+        name="test-key",
+        provider="openai",
+        base_url="https://api.openai.com/v1",
+        encrypted_api_key="ciphertext",
+        key_preview="sk-...test",
+        status=status
+    )
+
+
+@pytest.fixture
+def fake_backend(monkeypatch):
+    """替换 API Key 查询、客户端创建与使用统计，返回 (客户端, 已记录的使用)"""
+    client = FakeClient()
+    recorded: List[uuid.UUID] = []
+    api_key = make_api_key()
+
+    monkeypatch.setattr(
+        embedding_module.api_key_crud, "get",
+        lambda db, id, user_id: api_key if (id, user_id) == (KEY_ID, USER_ID) else None
+    )
+    monkeypatch.setattr(EmbeddingService, "_get_llm_client", lambda self, obj: client)
+    monkeypatch.setattr(embedding_module.usage_buffer, "record", recorded.append)
+    return client, recorded, api_key
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def create(texts: List[str], model: str = "text-embedding-3-small", key_id: uuid.UUID = KEY_ID) -> np.ndarray:
+    return run(EmbeddingService().create_embeddings(
+        api_key_id=key_id, user_id=USER_ID, texts=texts, model=model, db=None
+    ))
+
+
+def test_create_embeddings_returns_one_row_per_text(fake_backend):
+    client, recorded, _ = fake_backend
+
+    embeddings = create(["alpha", "beta"])
+
+    assert embeddings.dtype == np.float32
+    assert embeddings.shape == (2, DIM)
+    assert embeddings[0].tolist() == FakeClient.vector("alpha")
+    assert embeddings[1].tolist() == FakeClient.vector("beta")
+    assert recorded == [KEY_ID]
+
+
+def test_duplicate_texts_are_sent_once(fake_backend):
+    client, _, _ = fake_backend
+
+    embeddings = create(["a", "b", "a", "a"])
+
+    assert client.calls == [["a", "b"]]
+    assert np.array_equal(embeddings[0], embeddings[2])
+    assert np.array_equal(embeddings[0], embeddings[3])
+
+
+def test_over_limit_text_is_split_and_pooled(fake_backend):
+    client, _, _ = fake_backend
+    long_text = "word " * 1500
+
+    embeddings = create([long_text, "short"], model="bge-large-zh")
+
+    # 超长文本被切成多个窗口，合并后得到单位长度向量；短文本原样保留
+    assert len(client.calls[0]) > 2
+    assert embeddings.shape == (2, DIM)
+    assert np.isclose(np.linalg.norm(embeddings[0]), 1.0)
+    assert embeddings[1].tolist() == FakeClient.vector("short")
+
+
+def test_cjk_text_without_spaces_is_split(fake_backend):
+    client, _, _ = fake_backend
+    cjk_text = "向量数据库" * 240
+
+    embeddings = create([cjk_text], model="bge-large-zh")
+
+    # 无空格的中文按每字一个 token 估算，切出的窗口不超过模型的 512 token 上限
+    assert len(client.calls[0]) == 3
+    assert all(len(window) <= 512 for window in client.calls[0])
+    assert embeddings.shape == (1, DIM)
+
+
+@pytest.mark.parametrize("texts, model", [([], "text-embedding-3-small"), (["x"], " ")])
+def test_invalid_input_is_rejected(fake_backend, texts, model):
+    with pytest.raises(EmbeddingServiceError) as exc_info:
+        create(texts, model=model)
+    assert exc_info.value.error_code == "INVALID_INPUT"
+
+
+def test_blank_texts_are_rejected_with_positions(fake_backend):
+    client, _, _ = fake_backend
+
+    with pytest.raises(EmbeddingServiceError) as exc_info:
+        create(["alpha", "", "beta", "  \n"])
+    assert exc_info.value.error_code == "INVALID_INPUT"
+    assert "1, 3" in str(exc_info.value)
+    assert client.calls == []
+
+
+def test_text_too_long_is_rejected(fake_backend):
+    with pytest.raises(EmbeddingServiceError) as exc_info:
+        create(["x" * (embedding_module.MAX_TEXT_CHARS + 1)])
+    assert exc_info.value.error_code == "TEXT_TOO_LONG"
+
+
+def test_unknown_api_key_is_not_found(fake_backend):
+    with pytest.raises(EmbeddingServiceError) as exc_info:
+        create(["a"], key_id=uuid.uuid4())
+    assert exc_info.value.error_code == "NOT_FOUND"
+
+
+def test_inactive_api_key_is_rejected(fake_backend):
+    _, _, api_key = fake_backend
+    api_key.status = "inactive"
+
+    with pytest.raises(EmbeddingServiceError) as exc_info:
+        create(["a"])
+    assert exc_info.value.error_code == "INACTIVE"
+
+
+def test_provider_timeout(fake_backend, monkeypatch):
+    client, recorded, _ = fake_backend
+    client.delay = 1.0
+    monkeypatch.setattr(embedding_module.settings, "EMBEDDING_TIMEOUT_SECONDS", 0.05)
+
+    with pytest.raises(EmbeddingServiceError) as exc_info:
+        create(["a"])
+    assert exc_info.value.error_code == "TIMEOUT"
+    assert recorded == []
+
+
+@pytest.fixture
+def api_client(fake_backend):
+    app = FastAPI()
+    app.include_router(embeddings_router, prefix="/embeddings")
+    app.dependency_overrides[get_db] = lambda: None
+    app.dependency_overrides[get_current_active_user] = lambda: type("User", (), {"id": USER_ID})()
+    return TestClient(app)
+
+
+def test_create_embeddings_endpoint(api_client):
+    response = api_client.post("/embeddings/", json={
+        "api_key_id": str(KEY_ID), "model": "text-embedding-3-small", "texts": ["alpha", "beta"]
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["count"], body["dimension"]) == (2, DIM)
+    assert body["embeddings"][0] == FakeClient.vector("alpha")
+
+
+def test_create_embeddings_endpoint_maps_errors(api_client):
+    response = api_client.post("/embeddings/", json={
+        "api_key_id": str(uuid.uuid4()), "model": "text-embedding-3-small", "texts": ["a"]
+    })
+    assert response.status_code == 404
+
+
+def test_available_models_endpoint(api_client):
+    response = api_client.get(f"/embeddings/{KEY_ID}/models")
+
+    assert response.status_code == 200
+    assert "text-embedding-3-small" in response.json()["models"]
+
+
+def test_validate_endpoint_uses_cached_validation(api_client, monkeypatch):
+    calls = []
+
+    def validate_cached(provider, api_key, base_url):
+        calls.append((provider, api_key, base_url))
+        return True, "ok"
+
+    monkeypatch.setattr(embedding_module.LLMClientFactory, "validate_cached", validate_cached)
+    response = api_client.post(f"/embeddings/{KEY_ID}/validate")
+
+    assert response.status_code == 200
+    assert response.json() == {"success": True, "message": "ok"}
+    assert calls == [("openai", "sk-test", "https://api.openai.com/v1")]
+
+
+def test_text_splitting_runs_off_the_event_loop(fake_backend, monkeypatch):
+    client, _, _ = fake_backend
+    split_threads = []
+
+    def split_text(text, model, max_tokens, overlap):
+        split_threads.append(threading.get_ident())
+        return [text]
+
+    monkeypatch.setattr(client, "split_text", split_text)
+    create(["a"], model="bge-large-zh")
+
+    # 事件循环运行在当前线程，切分应在线程池中执行
+    assert split_threads and threading.get_ident() not in split_threads
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+测试 LLMClientFactory 的客户端缓存、校验结果缓存与并发限制，以及 API Key 更新/删除时的缓存清理
+
+不发送网络请求：客户端创建和密钥校验用替身代替
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from app.crud import api_key as api_key_crud_module
+from app.llm_clients import factory as factory_module
+from app.llm_clients.factory import LLMClientFactory
+from app.schemas.api_key import ApiKeyUpdate
+from app.services import api_key_service as api_key_service_module
+from app.services.api_key_service import api_key_service
+
+
+class FakeClient:
+    """记录 validate_api_key 调用次数的客户端替身"""
+
+    def __init__(self, provider, api_key, base_url, valid=True, delay=0.0):
+        self.key = (provider, api_key, base_url)
+        self.valid = valid
+        self.delay = delay
+        self.validations = 0
+
+    def validate_api_key(self):
+        self.validations += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return self.valid, "ok" if self.valid else "invalid"
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    """清空工厂缓存，并用 FakeClient 代替真实客户端；返回已创建的客户端列表"""
+    created = []
+
+    def create(cls, provider_key, api_key, base_url):
+        client = FakeClient(provider_key, api_key, base_url)
+        created.append(client)
+        return client
+
+    monkeypatch.setattr(LLMClientFactory, "_client_cache", OrderedDict())
+    monkeypatch.setattr(LLMClientFactory, "_validation_cache", OrderedDict())
+    monkeypatch.setattr(LLMClientFactory, "_validation_semaphores", {})
+    monkeypatch.setattr(LLMClientFactory, "_create_client", classmethod(create))
+    return created
+
+
+def test_get_client_reuses_instance_per_key(clients):
+    first = LLMClientFactory.get_client("openai", "sk-a", "https://a")
+
+    assert LLMClientFactory.get_client("OpenAI", "sk-a", "https://a") is first
+    assert LLMClientFactory.get_client("openai", "sk-a", "https://b") is not first
+    assert LLMClientFactory.get_client("openai", "sk-b", "https://a") is not first
+    assert len(clients) == 3
+
+
+def test_get_client_evicts_least_recently_used(clients, monkeypatch):
+    monkeypatch.setattr(LLMClientFactory, "_CLIENT_CACHE_SIZE", 2)
+    a = LLMClientFactory.get_client("openai", "sk-a")
+    b = LLMClientFactory.get_client("openai", "sk-b")
+    LLMClientFactory.get_client("openai", "sk-a")  # a 变为最近使用
+    LLMClientFactory.get_client("openai", "sk-c")  # 淘汰 b
+
+    assert LLMClientFactory.get_client("openai", "sk-a") is a
+    assert LLMClientFactory.get_client("openai", "sk-b") is not b
+
+
+def test_invalidate_removes_clients_and_validations_for_key(clients):
+    a = LLMClientFactory.get_client("openai", "sk-a", "https://a")
+    LLMClientFactory.validate_cached("openai", "sk-a", "https://b")
+    other = LLMClientFactory.get_client("openai", "sk-other")
+
+    LLMClientFactory.invalidate("sk-a")
+
+    assert LLMClientFactory.get_client("openai", "sk-a", "https://a") is not a
+    assert LLMClientFactory.get_client("openai", "sk-other") is other
+    assert not any(key[1] == LLMClientFactory._hash_key("sk-a") for key in LLMClientFactory._validation_cache)
+
+
+def test_validate_cached_respects_ttl(clients, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(factory_module.time, "monotonic", lambda: now[0])
+
+    LLMClientFactory.validate_cached("openai", "sk-a")
+    LLMClientFactory.validate_cached("openai", "sk-a")
+    assert clients[0].validations == 1
+
+    now[0] += LLMClientFactory._VALIDATION_TTL_SECONDS + 1
+    LLMClientFactory.validate_cached("openai", "sk-a")
+    assert clients[0].validations == 2
+
+
+def test_validate_cached_expires_failures_sooner(clients, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(factory_module.time, "monotonic", lambda: now[0])
+    client = LLMClientFactory.get_client("openai", "sk-bad")
+    client.valid = False
+
+    assert LLMClientFactory.validate_cached("openai", "sk-bad") == (False, "invalid")
+    now[0] += LLMClientFactory._VALIDATION_NEGATIVE_TTL_SECONDS + 1
+    LLMClientFactory.validate_cached("openai", "sk-bad")
+
+    assert client.validations == 2
+
+
+def test_validate_limits_concurrency_per_provider(clients, monkeypatch):
+    monkeypatch.setitem(LLMClientFactory._VALIDATION_CONCURRENCY, "bce-qianfan", 2)
+    in_flight = []
+    peak = []
+    lock = threading.Lock()
+
+    class SlowClient(FakeClient):
+        def validate_api_key(self):
+            with lock:
+                in_flight.append(1)
+                peak.append(len(in_flight))
+            time.sleep(0.05)
+            with lock:
+                in_flight.pop()
+            return True, "ok"
+
+    monkeypatch.setattr(
+        LLMClientFactory, "_create_client",
+        classmethod(lambda cls, provider_key, api_key, base_url: SlowClient(provider_key, api_key, base_url))
+    )
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        results = list(executor.map(lambda i: LLMClientFactory.validate("bce-qianfan", f"key-{i}"), range(6)))
+
+    assert all(valid for valid, _ in results)
+    assert max(peak) <= 2
+
+
+@pytest.fixture
+def stored_key(monkeypatch):
+    """用内存中的记录代替数据库中的 API Key，返回 (密文, 明文, 已清理的明文列表)"""
+    encrypted, plaintext = "ciphertext", "sk-stored"
+    invalidated = []
+    monkeypatch.setattr(api_key_crud_module, "decrypt_api_key", lambda key: plaintext)
+    monkeypatch.setattr(api_key_crud_module, "_decrypt_cache", OrderedDict())
+    monkeypatch.setattr(api_key_service_module.LLMClientFactory, "invalidate", invalidated.append)
+    return encrypted, plaintext, invalidated
+
+
+def test_delete_api_key_invalidates_caches(stored_key, monkeypatch):
+    encrypted, plaintext, invalidated = stored_key
+    crud = api_key_service_module.api_key_crud
+    monkeypatch.setattr(crud, "delete_returning_encrypted_key", lambda db, id, user_id: encrypted)
+    crud.get_plaintext_key(encrypted_key=encrypted)
+
+    assert api_key_service.delete_api_key(api_key_id=uuid.uuid4(), user_id=uuid.uuid4(), db=None)
+
+    assert invalidated == [plaintext]
+    assert encrypted not in api_key_crud_module._decrypt_cache
+
+
+def test_delete_missing_api_key_is_not_found(stored_key, monkeypatch):
+    crud = api_key_service_module.api_key_crud
+    monkeypatch.setattr(crud, "delete_returning_encrypted_key", lambda db, id, user_id: None)
+
+    with pytest.raises(api_key_service_module.ApiKeyServiceError) as exc_info:
+        api_key_service.delete_api_key(api_key_id=uuid.uuid4(), user_id=uuid.uuid4(), db=None)
+    assert exc_info.value.error_code == "NOT_FOUND"
+    assert stored_key[2] == []
+
+
+@pytest.mark.parametrize("update, invalidates", [
+    ({"base_url": "https://new"}, True),
+    ({"status": "inactive"}, True),
+    ({"name": "renamed"}, False),
+])
+def test_update_api_key_invalidates_on_connection_changes(stored_key, monkeypatch, update, invalidates):
+    encrypted, plaintext, invalidated = stored_key
+    updated = SimpleNamespace(encrypted_api_key=encrypted)
+    monkeypatch.setattr(api_key_service_module.api_key_crud, "update_by_id", lambda db, id, user_id, obj_in: updated)
+    monkeypatch.setattr(api_key_service, "_format_api_key_response", lambda obj: obj)
+
+    api_key_service.update_api_key(
+        api_key_id=uuid.uuid4(), user_id=uuid.uuid4(), update_data=ApiKeyUpdate(**update), db=None
+    )
+
+    assert invalidated == ([plaintext] if invalidates else [])
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+测试 LLM 客户端的子批次切分（_pack_by_tokens）
+
+不发送网络请求：只检查切分结果
+"""
+
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+from app.llm_clients import openai_client
+from app.llm_clients.base import LLMClient, Embeddings
+from app.llm_clients.openai_client import OpenAIClient
+
+
+class WordClient(LLMClient):
+    """使用基类按空白分词估算 token 的最小客户端"""
+
+    def create_embeddings(self, texts: List[str], options: Dict[str, Any]) -> Embeddings:
+        raise NotImplementedError
+
+    def validate_api_key(self) -> Tuple[bool, str]:
+        return True, "ok"
+
+
+def batch_sizes(slices: List[slice]) -> List[int]:
+    return [s.stop - s.start for s in slices]
+
+
+def covers_in_order(slices: List[slice], n: int) -> bool:
+    return [i for s in slices for i in range(s.start, s.stop)] == list(range(n))
+
+
+def test_pack_respects_token_limit():
+    texts = ["a b c", "d e", "f g h i", "j"]
+
+    slices = WordClient()._pack_by_tokens(texts, "m", max_tokens=5)
+
+    assert batch_sizes(slices) == [2, 2]
+    assert covers_in_order(slices, len(texts))
+
+
+def test_item_over_token_limit_gets_its_own_batch():
+    texts = ["a", "w " * 20, "b"]
+
+    slices = WordClient()._pack_by_tokens(texts, "m", max_tokens=5)
+
+    # 单条超限的文本不会被丢弃，也不会和其他文本合并
+    assert slices == [slice(0, 1), slice(1, 2), slice(2, 3)]
+
+
+def test_pack_respects_item_limit():
+    texts = ["x"] * 7
+
+    slices = WordClient()._pack_by_tokens(texts, "m", max_tokens=1000, max_items=3)
+
+    assert batch_sizes(slices) == [3, 3, 1]
+    assert covers_in_order(slices, len(texts))
+
+
+def test_pack_empty_input():
+    assert WordClient()._pack_by_tokens([], "m") == []
+
+
+@pytest.fixture
+def no_tiktoken(monkeypatch):
+    """模拟未安装 tiktoken 的环境"""
+    monkeypatch.setattr(openai_client, "tiktoken", None)
+    openai_client._get_encoding.cache_clear()
+    yield
+    openai_client._get_encoding.cache_clear()
+
+
+def test_openai_count_tokens_fallback_without_tiktoken(no_tiktoken):
+    client = OpenAIClient(api_key="sk-test")
+
+    counts = client.count_tokens(["abcdefgh", "向量数据库"], "text-embedding-3-small")
+
+    # 英文按 UTF-8 字节数 / 4 估算；中文每字至少计 1 个 token
+    assert counts == [3, 5]
+
+
+def test_openai_pack_fallback_without_tiktoken(no_tiktoken):
+    client = OpenAIClient(api_key="sk-test")
+    texts = ["中" * 40, "中" * 40, "中" * 40]
+
+    slices = client._pack_by_tokens(texts, "text-embedding-3-small", max_tokens=100)
+
+    assert batch_sizes(slices) == [2, 1]
+
+
+def test_openai_pack_with_tiktoken():
+    pytest.importorskip("tiktoken")
+    openai_client._get_encoding.cache_clear()
+    if openai_client._get_encoding("text-embedding-3-small") is None:
+        pytest.skip("tiktoken 编码文件不可用（需要联网下载）")
+    client = OpenAIClient(api_key="sk-test")
+    texts = ["hello world"] * 10
+    per_text = client.count_tokens(texts[:1], "text-embedding-3-small")[0]
+
+    slices = client._pack_by_tokens(texts, "text-embedding-3-small", max_tokens=per_text * 4)
+
+    assert batch_sizes(slices) == [4, 4, 2]
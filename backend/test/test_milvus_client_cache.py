@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+测试 MilvusClient 缓存的借出/归还与淘汰
+
+不连接 Milvus：客户端用记录 close 调用的替身代替
+"""
+
+import pytest
+
+from app.services import milvus_connection_service as service_module
+from app.services.milvus_connection_service import (
+    _checkin_milvus_client,
+    _checkout_milvus_client,
+    milvus_connection_service,
+)
+
+
+class FakeMilvusClient:
+    """记录是否被关闭的客户端替身；probe_error 不为空时探活调用抛出该错误"""
+
+    probe_error = None
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.closed = False
+
+    def get_server_version(self):
+        if self.probe_error:
+            raise Exception(self.probe_error)
+        return "v2.6.0"
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(service_module, "_client_cache", type(service_module._client_cache)())
+    monkeypatch.setattr(service_module, "MilvusClient", FakeMilvusClient)
+    FakeMilvusClient.probe_error = None
+
+
+def test_checkout_reuses_cached_client():
+    first = _checkout_milvus_client(("a",), FakeMilvusClient)
+    _checkin_milvus_client(first)
+    second = _checkout_milvus_client(("a",), FakeMilvusClient)
+
+    assert second.client is first.client
+    assert second.users == 1
+
+
+def test_evicted_client_is_not_closed_while_in_use():
+    holder = _checkout_milvus_client(("a",), FakeMilvusClient)
+    failing = _checkout_milvus_client(("a",), FakeMilvusClient)
+
+    _checkin_milvus_client(failing, evict=True)
+
+    # 另一个线程仍在使用，只移出缓存，不关闭
+    assert not holder.client.closed
+    assert ("a",) not in service_module._client_cache
+
+    _checkin_milvus_client(holder)
+    assert holder.client.closed
+
+
+def test_lru_overflow_defers_close_until_checkin(monkeypatch):
+    monkeypatch.setattr(service_module, "_CLIENT_CACHE_SIZE", 1)
+    held = _checkout_milvus_client(("a",), FakeMilvusClient)
+    other = _checkout_milvus_client(("b",), FakeMilvusClient)
+
+    assert ("a",) not in service_module._client_cache
+    assert not held.client.closed
+
+    _checkin_milvus_client(held)
+    _checkin_milvus_client(other)
+    assert held.client.closed
+    assert not other.client.closed
+
+
+def test_idle_expiry_defers_close_until_checkin(monkeypatch):
+    held = _checkout_milvus_client(("a",), FakeMilvusClient)
+    monkeypatch.setattr(service_module, "_CLIENT_IDLE_SECONDS", -1)
+    _checkin_milvus_client(_checkout_milvus_client(("b",), FakeMilvusClient))
+
+    assert ("a",) not in service_module._client_cache
+    assert not held.client.closed
+    _checkin_milvus_client(held)
+    assert held.client.closed
+
+
+@pytest.mark.parametrize("probe_error, evicted", [
+    ("permission denied", False),
+    ("connection refused", True),
+    ("authentication failed", True),
+])
+def test_probe_evicts_only_on_connection_or_auth_failure(probe_error, evicted):
+    FakeMilvusClient.probe_error = probe_error
+
+    milvus_connection_service._test_milvus_connection(uri="http://localhost:19530")
+
+    assert (len(service_module._client_cache) == 0) is evicted
+
+
+def test_probe_success_keeps_client_cached():
+    success, _, version, _ = milvus_connection_service._test_milvus_connection(uri="http://localhost:19530")
+
+    assert success and version == "v2.6.0"
+    (entry,) = service_module._client_cache.values()
+    assert entry.users == 0 and not entry.client.closed
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+测试 Milvus 连接 URI 的校验（快速正则与 urlparse 回退的结果应一致）
+"""
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.milvus_connection import MilvusConnectionUpdate
+
+
+@pytest.mark.parametrize("uri", [
+    "http://localhost:19530",
+    "https://in01-abc.zillizcloud.com:443/path",
+    "http://[::1]:19530",
+    "https://[2001:db8::1]",
+])
+def test_valid_uris(uri):
+    assert MilvusConnectionUpdate(uri=uri).uri == uri
+
+
+@pytest.mark.parametrize("uri", [
+    "http://[",
+    "http://[abc",
+    "http://[::1",
+    "https://[2001:db8::1/path",
+    "ftp://localhost:19530",
+    "localhost:19530",
+])
+def test_invalid_uris(uri):
+    with pytest.raises(ValidationError):
+        MilvusConnectionUpdate(uri=uri)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+测试 Milvus 连接的后台探测：传入对象的归属校验与后台会话的创建位置
+
+不连接数据库和 Milvus：查询与探测用替身代替，后台会话只做不发 SQL 的 merge(load=False)
+"""
+
+import threading
+import uuid
+
+import pytest
+
+from app.models.milvus_connection import MilvusConnection
+from app.services import milvus_connection_service as service_module
+from app.services.milvus_connection_service import milvus_connection_service
+
+USER_ID = uuid.uuid4()
+CONNECTION_ID = uuid.uuid4()
+
+
+def make_connection(connection_id=CONNECTION_ID, user_id=USER_ID) -> MilvusConnection:
+    return MilvusConnection(
+        id=connection_id,
+        user_id=user_id,
+        name="local",
+        uri="http://localhost:19530",
+        database_name="default",
+        encrypted_token="ciphertext",
+        status="active"
+    )
+
+
+@pytest.fixture
+def crud_get(monkeypatch):
+    """替换按 ID 查询，返回调用记录；查询结果为 None"""
+    calls = []
+
+    def get(db, id, user_id):
+        calls.append((id, user_id))
+        return None
+
+    monkeypatch.setattr(service_module.milvus_connection_crud, "get", get)
+    return calls
+
+
+def test_matching_connection_obj_skips_query(crud_get, monkeypatch):
+    monkeypatch.setattr(service_module.milvus_connection_crud, "get_plaintext_token", lambda connection: None)
+    monkeypatch.setattr(
+        milvus_connection_service, "_test_milvus_connection", lambda **kwargs: (True, "ok", "v2.6.0", None)
+    )
+
+    result = milvus_connection_service.validate_connection(
+        connection_id=CONNECTION_ID, user_id=USER_ID, db=None,
+        save_result=False, connection_obj=make_connection()
+    )
+
+    assert result[0] is True
+    assert crud_get == []
+
+
+@pytest.mark.parametrize("connection_obj", [
+    make_connection(connection_id=uuid.uuid4()),
+    make_connection(user_id=uuid.uuid4()),
+])
+def test_mismatched_connection_obj_is_not_trusted(crud_get, connection_obj):
+    result = milvus_connection_service.validate_connection(
+        connection_id=CONNECTION_ID, user_id=USER_ID, db=None,
+        save_result=True, connection_obj=connection_obj
+    )
+
+    # 不匹配的对象被忽略，改为按 ID 和用户查询（此处查询不到）
+    assert crud_get == [(CONNECTION_ID, USER_ID)]
+    assert result[0] is False
+
+
+class InlineThreadExecutor:
+    """在独立线程中同步执行提交的任务"""
+
+    def submit(self, fn):
+        worker = threading.Thread(target=fn)
+        worker.start()
+        worker.join()
+
+
+@pytest.fixture
+def background(monkeypatch):
+    """记录后台会话的创建线程和传给 validate_connection 的连接对象"""
+    seen = {}
+    real_session_local = service_module.SessionLocal
+
+    def session_local():
+        seen["session_thread"] = threading.get_ident()
+        return real_session_local()
+
+    def validate_connection(**kwargs):
+        seen["connection_obj"] = kwargs["connection_obj"]
+        return True, "ok", 1.0, None, None
+
+    monkeypatch.setattr(service_module, "_test_executor", InlineThreadExecutor())
+    monkeypatch.setattr(service_module, "SessionLocal", session_local)
+    monkeypatch.setattr(milvus_connection_service, "validate_connection", validate_connection)
+    return seen
+
+
+def test_background_probe_opens_session_in_worker(background):
+    connection = make_connection()
+
+    milvus_connection_service.async_test_connection(CONNECTION_ID, USER_ID, connection_obj=connection)
+
+    assert background["session_thread"] != threading.get_ident()
+    merged = background["connection_obj"]
+    assert merged is not connection
+    assert (merged.id, merged.user_id, merged.uri) == (connection.id, connection.user_id, connection.uri)
+
+
+def test_background_probe_ignores_mismatched_connection_obj(background):
+    milvus_connection_service.async_test_connection(
+        CONNECTION_ID, USER_ID, connection_obj=make_connection(user_id=uuid.uuid4())
+    )
+
+    assert background["connection_obj"] is None
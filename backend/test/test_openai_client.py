@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+测试 OpenAIClient 的响应解码、base64 回退与子批次请求的重试
+
+不发送网络请求：SDK 客户端用记录调用参数的替身代替
+"""
+
+import asyncio
+import base64
+from types import SimpleNamespace
+
+import httpx
+import numpy as np
+import pytest
+from openai import APIConnectionError, AuthenticationError, BadRequestError, InternalServerError, RateLimitError
+
+from app.llm_clients import openai_client
+from app.llm_clients.factory import LLMClientFactory
+from app.llm_clients.openai_client import OpenAIClient
+
+VECTORS = [[0.5, -1.0, 2.0], [3.25, 0.0, -0.125]]
+REQUEST = httpx.Request("POST", "https://api.example.com/v1/embeddings")
+
+
+def as_response(vectors, encoding_format=None):
+    """按请求的 encoding_format 构造 embeddings.create 的返回值"""
+    if encoding_format == "base64":
+        items = [base64.b64encode(np.asarray(v, dtype="<f4").tobytes()).decode() for v in vectors]
+    else:
+        items = vectors
+    return SimpleNamespace(data=[SimpleNamespace(embedding=item) for item in items])
+
+
+def status_error(error_class, status_code, message, headers=None):
+    response = httpx.Response(status_code, headers=headers, request=REQUEST)
+    return error_class(message, response=response, body=None)
+
+
+class FakeEmbeddings:
+    """依次返回 outcomes 中的结果（异常则抛出），记录每次调用的参数"""
+
+    def __init__(self, outcomes=None, reject_base64=False):
+        self.outcomes = list(outcomes or [])
+        self.reject_base64 = reject_base64
+        self.calls = []
+
+    def create(self, *, model, input, **kwargs):
+        self.calls.append(kwargs)
+        if self.reject_base64 and kwargs.get("encoding_format") == "base64":
+            raise status_error(BadRequestError, 400, "unsupported parameter: encoding_format")
+        if self.outcomes:
+            outcome = self.outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+        return as_response(VECTORS[:len(input)], kwargs.get("encoding_format"))
+
+
+class FakeAsyncEmbeddings(FakeEmbeddings):
+    async def create(self, **kwargs):
+        return super().create(**kwargs)
+
+
+def fake_sdk(embeddings):
+    return SimpleNamespace(embeddings=embeddings)
+
+
+def test_decode_base64_response_is_writable_float32():
+    client = OpenAIClient(api_key="sk-test", base64_embeddings=True)
+
+    embeddings = client._decode_response(as_response(VECTORS, "base64"))
+
+    assert embeddings.dtype == np.float32
+    assert embeddings.tolist() == VECTORS
+    # 调用方可以原地归一化
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+
+def test_decode_float_list_response():
+    embeddings = OpenAIClient(api_key="sk-test")._decode_response(as_response(VECTORS))
+
+    assert embeddings.tolist() == VECTORS
+
+
+def test_base64_is_only_requested_for_enabled_providers():
+    sdk = fake_sdk(FakeEmbeddings())
+    client = OpenAIClient(api_key="sk-test")
+
+    client._create_with_retry(sdk, "m", ["a", "b"])
+
+    assert sdk.embeddings.calls == [{}]
+
+
+def test_factory_enables_base64_per_provider():
+    openai = LLMClientFactory._create_client("openai", "sk-test", None)
+    nim = LLMClientFactory._create_client("nvidia-nim", "nvapi-test", None)
+
+    assert openai.base64_embeddings and not nim.base64_embeddings
+
+
+def test_rejected_base64_falls_back_to_floats():
+    sdk = fake_sdk(FakeEmbeddings(reject_base64=True))
+    client = OpenAIClient(api_key="sk-test", base64_embeddings=True)
+
+    embeddings = client._create_with_retry(sdk, "m", ["a", "b"])
+
+    assert embeddings.tolist() == VECTORS
+    assert sdk.embeddings.calls == [{"encoding_format": "base64"}, {}]
+    # 之后的请求不再携带 base64 参数
+    client._create_with_retry(sdk, "m", ["a"])
+    assert sdk.embeddings.calls[-1] == {}
+
+
+def test_rejected_base64_falls_back_to_floats_async():
+    sdk = fake_sdk(FakeAsyncEmbeddings(reject_base64=True))
+    client = OpenAIClient(api_key="sk-test", base64_embeddings=True)
+
+    embeddings = asyncio.run(client._acreate_with_retry(sdk, "m", ["a", "b"]))
+
+    assert embeddings.tolist() == VECTORS
+    assert not client.base64_embeddings
+
+
+def test_other_bad_requests_are_not_retried():
+    error = status_error(BadRequestError, 400, "input is too long")
+    sdk = fake_sdk(FakeEmbeddings([error]))
+    client = OpenAIClient(api_key="sk-test", base64_embeddings=True)
+
+    with pytest.raises(BadRequestError):
+        client._create_with_retry(sdk, "m", ["a"])
+    assert len(sdk.embeddings.calls) == 1
+    assert client.base64_embeddings
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    """记录退避等待的秒数而不真正等待"""
+    delays = []
+
+    async def async_sleep(seconds):
+        delays.append(seconds)
+
+    monkeypatch.setattr(openai_client.time, "sleep", delays.append)
+    monkeypatch.setattr(openai_client.asyncio, "sleep", async_sleep)
+    return delays
+
+
+def test_retries_transient_errors_until_success(no_sleep):
+    errors = [status_error(InternalServerError, 503, "unavailable"), APIConnectionError(request=REQUEST)]
+    sdk = fake_sdk(FakeEmbeddings(errors))
+
+    embeddings = OpenAIClient(api_key="sk-test")._create_with_retry(sdk, "m", ["a"])
+
+    assert embeddings.tolist() == VECTORS[:1]
+    assert len(sdk.embeddings.calls) == 3
+    assert len(no_sleep) == 2
+
+
+def test_gives_up_after_max_attempts(no_sleep):
+    errors = [status_error(InternalServerError, 500, "boom") for _ in range(openai_client._MAX_ATTEMPTS)]
+    sdk = fake_sdk(FakeEmbeddings(errors))
+
+    with pytest.raises(InternalServerError):
+        OpenAIClient(api_key="sk-test")._create_with_retry(sdk, "m", ["a"])
+    assert len(sdk.embeddings.calls) == openai_client._MAX_ATTEMPTS == 6
+    assert len(no_sleep) == openai_client._MAX_ATTEMPTS - 1
+    assert all(0 <= delay <= openai_client._MAX_BACKOFF_SECONDS for delay in no_sleep)
+
+
+@pytest.mark.parametrize("error", [
+    status_error(AuthenticationError, 401, "bad key"),
+    status_error(BadRequestError, 400, "input is too long"),
+    ValueError("unexpected"),
+])
+def test_non_retryable_errors_are_raised_immediately(no_sleep, error):
+    sdk = fake_sdk(FakeEmbeddings([error]))
+
+    with pytest.raises(type(error)):
+        OpenAIClient(api_key="sk-test")._create_with_retry(sdk, "m", ["a"])
+    assert len(sdk.embeddings.calls) == 1
+    assert no_sleep == []
+
+
+@pytest.mark.parametrize("retry_after, expected", [("2.5", 2.5), ("600", 60.0)])
+def test_rate_limit_honours_retry_after(no_sleep, retry_after, expected):
+    error = status_error(RateLimitError, 429, "slow down", headers={"retry-after": retry_after})
+    sdk = fake_sdk(FakeEmbeddings([error]))
+
+    OpenAIClient(api_key="sk-test")._create_with_retry(sdk, "m", ["a"])
+
+    # Retry-After 优先于指数退避，但不超过退避上限
+    assert no_sleep == [expected]
+
+
+def test_rate_limit_without_retry_after_uses_backoff(no_sleep):
+    error = status_error(RateLimitError, 429, "slow down")
+    sdk = fake_sdk(FakeEmbeddings([error, error]))
+
+    OpenAIClient(api_key="sk-test")._create_with_retry(sdk, "m", ["a"])
+
+    assert len(no_sleep) == 2
+    assert 0 <= no_sleep[0] <= 1 and 0 <= no_sleep[1] <= 2
+
+
+def test_async_retry_loop(no_sleep):
+    error = status_error(RateLimitError, 429, "slow down", headers={"retry-after": "1"})
+    sdk = fake_sdk(FakeAsyncEmbeddings([error, status_error(InternalServerError, 502, "bad gateway")]))
+
+    embeddings = asyncio.run(OpenAIClient(api_key="sk-test")._acreate_with_retry(sdk, "m", ["a"]))
+
+    assert embeddings.tolist() == VECTORS[:1]
+    assert len(sdk.embeddings.calls) == 3
+    assert no_sleep[0] == 1.0
+
+
+def test_async_retry_gives_up_on_non_retryable(no_sleep):
+    sdk = fake_sdk(FakeAsyncEmbeddings([status_error(AuthenticationError, 401, "bad key")]))
+
+    with pytest.raises(AuthenticationError):
+        asyncio.run(OpenAIClient(api_key="sk-test")._acreate_with_retry(sdk, "m", ["a"]))
+    assert no_sleep == []
@@ -4,38 +4,42 @@
 使用数据库中存储的多个提供商的 API keys
 """
 
+import logging
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # 添加项目根目录到 Python 路径
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from app.core.db import SessionLocal
 from app.crud.api_key import ApiKeyCRUD
+from app.models.api_key import ApiKey
 from app.llm_clients.factory import LLMClientFactory
 from app.core.config import settings
 from app.core.crypto import initialize_crypto
 
+logger = logging.getLogger(__name__)
 
-def get_api_key_from_db(provider: str) -> tuple[str, str, str] | None:
+
+def get_api_key_from_db(db: Session, provider: str) -> tuple[str, str, str] | None:
     """
     从数据库获取指定提供商的 API key
     
     Args:
+        db: 数据库会话
         provider: 提供商名称，如 'openai', 'nvidia-nim', 'bce-qianfan'
     
     Returns:
         tuple[api_key, base_url, provider] 或 None
     """
-    db: Session = SessionLocal()
     api_key_crud = ApiKeyCRUD()
     
     try:
-        from app.models.api_key import ApiKey
-        
         # 查询指定 provider 的 API key
         api_key_record = db.query(ApiKey).filter(
             ApiKey.provider == provider,
@@ -52,21 +56,56 @@ def get_api_key_from_db(provider: str) -> tuple[str, str, str] | None:
             print(f"❌ 数据库中没有找到活跃的 {provider} API key")
             return None
             
-    except Exception as e:
-        print(f"❌ 从数据库获取 {provider} API key 时出错: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("❌ 从数据库获取 %s API key 时出错", provider)
         return None
-    finally:
-        db.close()
 
 
-def test_single_provider(provider: str) -> bool:
+def get_api_keys_bulk(db: Session, providers: list[str]) -> dict[str, tuple[str, str, str]]:
+    """
+    一次查询获取多个提供商的 API key（每个提供商取一个活跃的）
+    
+    Args:
+        db: 数据库会话
+        providers: 提供商名称列表
+    
+    Returns:
+        {provider: (api_key, base_url, provider)}，没有活跃 key 的提供商不在结果中
+    """
+    api_key_crud = ApiKeyCRUD()
+    
+    try:
+        records = db.query(ApiKey).filter(
+            ApiKey.provider.in_(providers),
+            ApiKey.status == 'active'
+        ).all()
+        
+        first_by_provider = {}
+        for record in records:
+            first_by_provider.setdefault(record.provider, record)
+        
+        selected = list(first_by_provider.values())
+        plaintext_keys = api_key_crud.get_plaintext_keys_batch(
+            encrypted_keys=[record.encrypted_api_key for record in selected]
+        )
+        return {
+            record.provider: (plaintext_key, record.base_url, record.provider)
+            for record, plaintext_key in zip(selected, plaintext_keys)
+        }
+        
+    except Exception:
+        logger.exception("❌ 批量获取 API key 时出错")
+        return {}
+
+
+def check_single_provider(db: Session, provider: str, key_info: tuple[str, str, str] | None = None) -> bool:
     """
     测试单个提供商的 API key 验证
     
     Args:
+        db: 数据库会话（仅在未传 key_info 时使用）
         provider: 提供商名称
+        key_info: 已查询到的 (api_key, base_url, provider)；不传时单独查询数据库
         
     Returns:
         bool: 测试是否成功
@@ -75,7 +114,8 @@ def test_single_provider(provider: str) -> bool:
     print("-" * 50)
     
     # 1. 从数据库获取 API key
-    key_info = get_api_key_from_db(provider)
+    if key_info is None:
+        key_info = get_api_key_from_db(db, provider)
     
     if not key_info:
         print(f"❌ 跳过 {provider}：无法获取 API key")
@@ -102,7 +142,8 @@ def test_single_provider(provider: str) -> bool:
     print(f"🔍 正在验证 {actual_provider} API key...")
     
     try:
-        is_valid, message = client.validate_api_key()
+        # 经工厂校验：与应用共用按提供商的并发上限，并发测试时不会超出提供商限流
+        is_valid, message = LLMClientFactory.validate(actual_provider, api_key, base_url)
         
         print(f"📊 验证结果: {'✅ 有效' if is_valid else '❌ 无效'}")
         print(f"📝 返回消息: {message}")
@@ -114,16 +155,17 @@ def test_single_provider(provider: str) -> bool:
             print(f"⚠️  {actual_provider} API key 验证失败: {message}")
             return False
             
-    except Exception as e:
-        print(f"❌ 验证 {actual_provider} API key 时发生异常: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("❌ 验证 %s API key 时发生异常", actual_provider)
         return False
 
 
-def test_multiple_providers():
+def check_multiple_providers(db: Session):
     """
     测试多个提供商的 API key 验证
+    
+    Args:
+        db: 数据库会话
     """
     print("🚀 开始测试多个提供商的 validate_api_key() 函数...")
     print("🎯 目标：openai、siliconflow、nvidia-nim、bce-qianfan")
@@ -148,12 +190,26 @@ def test_multiple_providers():
     
     # 2. 测试目标提供商
     target_providers = ["openai", "siliconflow", "nvidia-nim", "bce-qianfan"]
-    results = {}
     
-    print(f"\n2️⃣ 开始测试 {len(target_providers)} 个提供商...")
+    print(f"\n2️⃣ 开始并发测试 {len(target_providers)} 个提供商...")
     
+    # 一次查询取回所有目标提供商的 key，避免每个提供商各开一次会话和查询
+    key_infos = get_api_keys_bulk(db, target_providers)
     for provider in target_providers:
-        results[provider] = test_single_provider(provider)
+        if provider not in key_infos:
+            print(f"❌ 数据库中没有找到活跃的 {provider} API key")
+    
+    def validate(provider: str) -> bool:
+        key_info = key_infos.get(provider)
+        if key_info is None:
+            print(f"❌ 跳过 {provider}：无法获取 API key")
+            return False
+        # key_info 已传入，并发的验证线程不会使用（非线程安全的）会话
+        return check_single_provider(db, provider, key_info)
+    
+    # 各提供商的验证都在等待网络，并发执行后总耗时约为最慢的一个（输出可能交错）
+    with ThreadPoolExecutor(max_workers=len(target_providers)) as executor:
+        results = dict(zip(target_providers, executor.map(validate, target_providers)))
     
     # 3. 输出汇总结果
     print("\n" + "=" * 60)
@@ -176,6 +232,18 @@ def test_multiple_providers():
         print("❌ 所有提供商验证都失败，请检查配置")
 
 
+def test_multiple_providers():
+    """测试多个提供商的 API key 验证（pytest 入口，自行打开数据库会话）"""
+    with SessionLocal() as db:
+        check_multiple_providers(db)
+
+
+def test_available_providers():
+    """显示数据库中所有可用的 API 提供商（pytest 入口，自行打开数据库会话）"""
+    with SessionLocal() as db:
+        check_available_providers(db)
+
+
 def test_error_handling():
     """
     使用假的 API key 测试各种客户端的错误处理
@@ -230,26 +298,28 @@ def test_error_handling():
             print(f"   ❌ 测试 {provider} 假 API key 时发生异常: {e}")
 
 
-def test_available_providers():
+def check_available_providers(db: Session):
     """
     显示数据库中所有可用的 API 提供商
+    
+    Args:
+        db: 数据库会话
     """
     print("\n" + "=" * 60)
     print("📋 检查数据库中所有可用的 API 提供商...")
     
-    db: Session = SessionLocal()
     try:
-        from app.models.api_key import ApiKey
-        
-        # 获取所有提供商的统计
-        providers = db.query(ApiKey.provider, ApiKey.status).all()
+        # 获取所有提供商的统计（在数据库中按提供商和状态分组计数，只返回计数行）
+        providers = db.query(
+            ApiKey.provider, ApiKey.status, func.count(ApiKey.id)
+        ).group_by(ApiKey.provider, ApiKey.status).all()
         
         if providers:
             provider_stats = {}
-            for provider, status in providers:
+            for provider, status, count in providers:
                 if provider not in provider_stats:
                     provider_stats[provider] = {"active": 0, "inactive": 0}
-                provider_stats[provider][status] += 1
+                provider_stats[provider][status] += count
             
             print("📊 提供商统计:")
             for provider, stats in provider_stats.items():
@@ -259,16 +329,16 @@ def test_available_providers():
             
     except Exception as e:
         print(f"❌ 获取提供商信息时出错: {e}")
-    finally:
-        db.close()
 
 
 if __name__ == "__main__":
-    # 检查所有可用的提供商
-    test_available_providers()
-    
-    # 测试多个提供商的 API keys
-    test_multiple_providers()
+    # 所有数据库辅助函数共用一个会话，只从连接池取一次连接
+    with SessionLocal() as db:
+        # 检查所有可用的提供商
+        check_available_providers(db)
+        
+        # 测试多个提供商的 API keys
+        check_multiple_providers(db)
     
     # 测试错误处理
     test_error_handling()
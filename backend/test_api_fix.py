@@ -16,10 +16,13 @@ def test_api_key_list():
         "password": "test123"         # 需要替换为实际的密码
     }
     
+    # 复用同一个 Session：连接池保持 keep-alive，登录与后续请求共用 TCP 连接
+    session = requests.Session()
+    
     try:
         # 1. 登录获取 token
         print("🔐 正在登录...")
-        login_response = requests.post(login_url, json=login_data)
+        login_response = session.post(login_url, json=login_data)
         print(f"登录响应状态: {login_response.status_code}")
         
         if login_response.status_code != 200:
@@ -28,14 +31,14 @@ def test_api_key_list():
             return
         
         token = login_response.json()["access_token"]
+        session.headers.update({"Authorization": f"Bearer {token}"})
         print("✅ 登录成功")
         
         # 2. 测试 API Key 列表接口
         print("\n📋 正在测试 API Key 列表接口...")
         list_url = "http://127.0.0.1:8000/api/v1/keys/?page=1&size=10"
-        headers = {"Authorization": f"Bearer {token}"}
         
-        list_response = requests.get(list_url, headers=headers)
+        list_response = session.get(list_url)
         print(f"API Key 列表响应状态: {list_response.status_code}")
         
         if list_response.status_code == 200:
@@ -50,6 +53,8 @@ def test_api_key_list():
         print("❌ 无法连接到服务器，请确保后端服务正在运行")
     except Exception as e:
         print(f"❌ 测试过程中发生错误: {e}")
+    finally:
+        session.close()
 
 if __name__ == "__main__":
     test_api_key_list()